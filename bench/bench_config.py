@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la capa de config (scraper.config) con una watchlist sintética.
+
+Genera N entradas (default 10000, con URLs repetidas y algunas con `chapter`) en un
+archivo temporal y mide:
+  - carga YAML con el loader puro de PyYAML y con el de libyaml (CSafeLoader)
+  - armado de los Series (nombre/URL/host; norm_url y chapter_key se calculan al pedirlos)
+  - dedupe por URL normalizada y guardado (CSafeDumper)
+  - memoria retenida de las entradas como dicts vs como Series (tracemalloc)
+Sale con código 1 si load_series() pasa de --max-ms, así sirve de gate.
+
+Uso:
+  python bench/bench_config.py [--entries 10000] [--repeat 3] [--max-ms 1500]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from scraper.config import Series, load_series, save_series  # noqa: E402
+from scraper.utils import YAML_LOADER  # noqa: E402
+
+HOSTS = ("m440.in", "bokugents.com", "mangasnosekai.com", "animebbg.net", "zonatmo.com", "www.m440.in")
+
+def make_watchlist(n: int, seed: int = 18) -> dict:
+    rng = random.Random(seed)
+    series = []
+    for i in range(n):
+        # ~5% repetidas (otra mayúscula/slash), como las que limpia dedupe_series.py
+        j = rng.randrange(i) if i and rng.random() < 0.05 else i
+        host = HOSTS[j % len(HOSTS)]
+        url = f"https://{host}/manga/serie-{j}-{'x' * (j % 13)}/"
+        if j != i:
+            url = url.replace("https://", "HTTPS://").rstrip("/")
+        e = {"name": f"  Serie número {j}, con un título largo de relleno {'ñ' * (j % 7)} ", "url": url}
+        if rng.random() < 0.2:
+            e["chapter"] = f"{rng.randint(1, 999)}" + (".5" if rng.random() < 0.1 else "")
+        series.append(e)
+    return {"series": series}
+
+def timed(fn, repeat: int):
+    times, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return result, min(times), statistics.median(times)
+
+def memory_kb(fn):
+    """(KB que quedan vivos con el resultado, KB pico durante la carga)"""
+    tracemalloc.start()
+    keep = fn()  # noqa: F841 (se mide lo que queda vivo)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 1024, peak / 1024
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-ms", type=float, default=1500.0)
+    args = ap.parse_args()
+
+    data = make_watchlist(args.entries)
+    tmpdir = tempfile.mkdtemp(prefix="bench_config_")
+    path = os.path.join(tmpdir, "series.yaml")
+    with open(path, "w", encoding="utf-8") as fh:
+        yaml.safe_dump(data, fh, allow_unicode=True, sort_keys=False)
+    print(f"{args.entries} entradas, {os.path.getsize(path) / 1024:.0f} KB, libyaml={'sí' if yaml.__with_libyaml__ else 'no'}")
+
+    def load_with(loader):
+        with open(path, "r", encoding="utf-8") as fh:
+            return yaml.load(fh, Loader=loader)
+
+    _, py_min, py_med = timed(lambda: load_with(yaml.SafeLoader), args.repeat)
+    raw, c_min, c_med = timed(lambda: load_with(YAML_LOADER), args.repeat)
+    _, rec_min, rec_med = timed(lambda: [Series.from_entry(e, i) for i, e in enumerate(raw["series"])], args.repeat)
+    series, ls_min, ls_med = timed(lambda: load_series(path), args.repeat)
+
+    def dedupe():
+        best = {}
+        for s in series:
+            key = s.norm_url
+            if key not in best or s.chapter_key > best[key].chapter_key:
+                best[key] = s
+        return best
+    best, dd_min, dd_med = timed(dedupe, args.repeat)
+    out = os.path.join(tmpdir, "out.yaml")
+    _, sv_min, sv_med = timed(lambda: save_series(out, best.values()), args.repeat)
+
+    dict_kb, dict_peak = memory_kb(lambda: load_with(YAML_LOADER))
+    rec_kb, rec_peak = memory_kb(lambda: load_series(path))
+
+    rows = [
+        ("yaml.SafeLoader (puro)", py_min, py_med),
+        (f"{YAML_LOADER.__name__}", c_min, c_med),
+        ("Series.from_entry x N", rec_min, rec_med),
+        ("load_series (total)", ls_min, ls_med),
+        (f"dedupe ({len(best)} únicas)", dd_min, dd_med),
+        ("save_series", sv_min, sv_med),
+    ]
+    print(f"\n{'etapa':<28} {'ms(min)':>9} {'ms(med)':>9}")
+    for name, mn, med in rows:
+        print(f"{name:<28} {mn:>9.1f} {med:>9.1f}")
+    print(f"\nmemoria retenida: dicts {dict_kb:.0f} KB, Series {rec_kb:.0f} KB "
+          f"(pico {dict_peak:.0f} / {rec_peak:.0f} KB)")
+
+    ok = ls_med <= args.max_ms
+    print(f"\nload_series mediana {ls_med:.1f} ms {'<=' if ok else '>'} {args.max_ms:.0f} ms: {'ok' if ok else 'FALLA'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tiempo de arranque de cada subcomando de cli.py.
+
+Para cada subcomando lanza un intérprete nuevo que importa cli y carga el handler
+(cli.load), --repeat veces, y mide solo los imports (sin el arranque de Python, que se
+muestra aparte como base). También dice qué dependencias pesadas quedaron cargadas.
+Sale con código 1 si la mediana de alguno pasa su presupuesto (COMMANDS en cli.py;
+--scale lo multiplica para máquinas más lentas), así sirve de gate.
+
+Uso:
+  python bench/bench_imports.py [--repeat 5] [--scale 1.0] [--only check]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import cli  # noqa: E402
+
+HEAVY = ("playwright", "requests", "bs4", "lxml", "yaml", "asyncio")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import cli
+cli.load(sys.argv[1])
+ms = (time.perf_counter() - t0) * 1000
+print(json.dumps({"ms": ms, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY,)
+
+def probe(name: str) -> dict:
+    env = dict(os.environ, FETCH_BACKEND=os.getenv("FETCH_BACKEND", "http"))
+    out = subprocess.run([sys.executable, "-c", PROBE, name], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def baseline_ms(repeat: int) -> float:
+    """Mediana del tiempo de pared de `python -c pass` (lo que cuesta el intérprete solo)."""
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        runs.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(runs)
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--scale", type=float, default=1.0)
+    ap.add_argument("--only", default=None)
+    args = ap.parse_args()
+
+    names = [args.only] if args.only else list(cli.COMMANDS)
+    print(f"arranque de Python sin imports: ~{baseline_ms(args.repeat):.0f} ms\n")
+    print(f"{'subcomando':<10} {'ms(min)':>8} {'ms(med)':>8} {'budget':>7}  cargados")
+    failures = 0
+    for name in names:
+        runs = [probe(name) for _ in range(args.repeat)]
+        times = [r["ms"] for r in runs]
+        med = statistics.median(times)
+        budget = cli.COMMANDS[name][2] * args.scale
+        ok = med <= budget
+        failures += 0 if ok else 1
+        heavy = ", ".join(runs[-1]["heavy"]) or "-"
+        print(f"{name:<10} {min(times):>8.1f} {med:>8.1f} {budget:>7.0f}  {heavy}{'' if ok else '  FALLA'}")
+    print(f"\n{len(names)} subcomandos, {failures} sobre el presupuesto")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark offline de los parsers de scraper/sites y del clasificador de scraper.antibot.
+
+Para cada caso de bench/fixtures/expected.yaml mide tiempo (mejor/mediana de N
+repeticiones), pico de memoria del heap de Python (tracemalloc; no ve lo que reserva
+libxml2 por dentro) y verifica el capítulo y el veredicto anti-bot esperados (con el
+status y los headers del caso, si los tiene). Además calcula la huella (scraper.fingerprint)
+de cada caso en dos intérpretes con distinto PYTHONHASHSEED: tiene que salir igual, si no
+no se reutiliza entre corridas. Sale con código 1 si algo no coincide, así sirve de gate.
+
+Uso:
+  python bench/bench_parsers.py [--repeat 5] [--site m440] [--json salida.json]
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import yaml
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+FIXTURES = os.path.join(HERE, "fixtures")
+sys.path.insert(0, ROOT)
+
+from scraper.sites import animebbg, bokugents, m440, mangasnosekai, zonatmo  # noqa: E402
+from scraper import antibot, fingerprint  # noqa: E402
+
+PARSERS = {
+    "animebbg": animebbg.parse_latest_chapter,
+    "bokugents": bokugents.parse_latest_chapter,
+    "m440": m440.parse_latest_chapter,
+    "mangasnosekai": mangasnosekai.parse_latest_chapter,
+    "zonatmo": zonatmo.parse_latest_chapter,
+}
+
+def load_fixture(rel: str) -> str:
+    path = os.path.join(FIXTURES, rel)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        return fh.read()
+
+def measure(fn, arg, repeat: int):
+    """(resultado, mejor_ms, mediana_ms, pico_kb)"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, min(times), statistics.median(times), peak / 1024
+
+# Con estas dos semillas el repr de frozenset({"cap", "ch", "ep"}) sale en distinto orden
+SEEDS = ("1", "3")
+
+def fingerprints(cases) -> list:
+    """Huella de cada caso (en este proceso)."""
+    return [fingerprint.of(load_fixture(c["file"]), PARSERS[c["site"]]) for c in cases]
+
+def fingerprints_by_seed(cases) -> dict:
+    """{PYTHONHASHSEED: [huella por caso]}, cada una en un intérprete aparte."""
+    out = {}
+    for seed in SEEDS:
+        env = dict(os.environ, PYTHONHASHSEED=seed, FINGERPRINT="1")
+        proc = subprocess.run([sys.executable, __file__, "--fingerprints"], input=json.dumps(cases),
+                              env=env, capture_output=True, text=True, check=True)
+        out[seed] = json.loads(proc.stdout)
+    return out
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--site", default=None)
+    ap.add_argument("--json", dest="json_out", default=None)
+    # interno: imprime las huellas de los casos que llegan por stdin (ver fingerprints_by_seed)
+    ap.add_argument("--fingerprints", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.fingerprints:
+        print(json.dumps(fingerprints(json.load(sys.stdin))))
+        return 0
+
+    with open(os.path.join(FIXTURES, "expected.yaml"), "r", encoding="utf-8") as fh:
+        cases = yaml.safe_load(fh)["cases"]
+    if args.site:
+        cases = [c for c in cases if c["site"] == args.site]
+
+    rows = []
+    failures = 0
+    print(f"{'caso':<36} {'parser':<14} {'ms(min)':>8} {'ms(med)':>8} {'KB pico':>9} {'antibot ms':>10}  ok")
+    for case in cases:
+        html = load_fixture(case["file"])
+        parser = PARSERS[case["site"]]
+        cur, p_min, p_med, p_peak = measure(parser, html, args.repeat)
+        verdict, a_min, _, _ = measure(lambda h: antibot.classify(h, case.get("status"), case.get("headers")),
+                                       html, args.repeat)
+        bot = verdict.blocked
+
+        ok_cur = cur == case["chapter"]
+        ok_bot = bot == case["antibot"]
+        ok = ok_cur and ok_bot
+        failures += 0 if ok else 1
+        flag = "✓" if ok else ("✗ cap=%r" % cur if not ok_cur else "✗ antibot=%r" % verdict)
+        print(f"{case['file']:<36} {case['site']:<14} {p_min:>8.2f} {p_med:>8.2f} {p_peak:>9.0f} {a_min:>10.3f}  {flag}")
+        rows.append({
+            "file": case["file"], "site": case["site"], "bytes": len(html),
+            "parse_ms_min": round(p_min, 3), "parse_ms_median": round(p_med, 3), "parse_peak_kb": round(p_peak, 1),
+            "antibot_ms_min": round(a_min, 4), "chapter": cur, "antibot": bot,
+            "antibot_confidence": verdict.confidence, "antibot_reason": verdict.reason, "ok": ok,
+        })
+
+    by_seed = fingerprints_by_seed(cases)
+    a, b = (by_seed[seed] for seed in SEEDS)
+    unstable = [c["file"] for c, x, y in zip(cases, a, b) if x != y]
+    for row, fp in zip(rows, a):
+        row["fingerprint"] = fp
+    if unstable:
+        failures += len(unstable)
+        print(f"\n✗ huella distinta con PYTHONHASHSEED={SEEDS[0]} y {SEEDS[1]}: {', '.join(unstable)}")
+    else:
+        print(f"\nhuellas iguales con PYTHONHASHSEED={SEEDS[0]} y {SEEDS[1]} "
+              f"({sum(1 for fp in a if fp)} de {len(cases)} casos con huella)")
+
+    total = sum(r["parse_ms_median"] for r in rows)
+    print(f"{len(rows)} casos, {failures} fallos, parse total (mediana) {total:.1f} ms")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump({"cases": rows, "failures": failures}, fh, ensure_ascii=False, indent=1)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Genera el corpus de fixtures de bench/fixtures (determinista, sin red).
+
+Por sitio: página normal, lista enorme (gzip), página sin capítulos; más páginas
+anti-bot comunes, una que solo se delata por la respuesta (status/headers del caso) y
+una página normal con frases de challenge sueltas. El capítulo esperado se fija aquí a mano, no con el parser,
+para que el benchmark detecte regresiones.
+
+Uso:
+  python bench/make_fixtures.py
+"""
+import copy
+import gzip
+import os
+import random
+
+import yaml
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+
+PAGE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="/wp-content/themes/x/style.css">
+<script src="https://www.googletagmanager.com/gtag/js?id=G-XXXX"></script>
+</head><body class="{body_class}">
+<header><nav><a href="/">Inicio</a> <a href="/biblioteca/">Biblioteca</a> <a href="/top-10/">Top 10</a>
+<a href="/page/2/">Página 2</a></nav></header>
+<main>{main}</main>
+<footer><a href="/dmca/">DMCA</a> <a href="/contacto/">Contacto</a> © 2024</footer>
+</body></html>
+"""
+
+def _chapters(n: int, extras=()):
+    """Lista descendente 1..n más capítulos decimales extra."""
+    nums = [str(i) for i in range(1, n + 1)] + list(extras)
+    nums.sort(key=lambda s: tuple(int(p) for p in s.split(".")), reverse=True)
+    return nums
+
+def _comments(rng: random.Random, k: int) -> str:
+    # Ruido: comentarios con enlaces y números que no son capítulos
+    out = []
+    for i in range(k):
+        out.append(f'<div class="comment"><a href="/user/{rng.randint(1, 99999)}/">usuario{i}</a> '
+                   f'<p>me encantó, esperando el {rng.randint(2025, 2030)} jaja</p></div>')
+    return "\n".join(out)
+
+# --- plantillas por sitio ----------------------------------------------------
+
+def bokugents(nums, noise=""):
+    items = "\n".join(
+        f'<li class="wp-manga-chapter"><a href="https://bokugents.com/manga/a-rank-party/capitulo-{n.replace(".", "-")}/">'
+        f'Capítulo {n}</a> <span class="chapter-release-date"><i>hace 2 días</i></span></li>'
+        for n in nums)
+    main = f'<div class="post-title"><h1>A Rank Party</h1></div><ul class="main version-chap">{items}</ul>{noise}'
+    return PAGE.format(title="A Rank Party – Bokugents", body_class="manga-page", main=main)
+
+def m440(nums, noise=""):
+    items = "\n".join(
+        f'<li class="DTyuZxQygzByzNbtcmg-lis"><h5><a href="https://m440.in/manga/became-an-apartment-manager/{n}-x{i:04x}">'
+        f'#{n}</a> <em>Capitulo</em></h5><div class="date">2024-05-01</div></li>'
+        for i, n in enumerate(nums))
+    main = f'<h2 class="widget-title">Became An Apartment Manager</h2><ul class="chapters">{items}</ul>{noise}'
+    return PAGE.format(title="Became An Apartment Manager - M440", body_class="", main=main)
+
+def mangasnosekai(nums, noise=""):
+    items = "\n".join(
+        f'<li class="wp-manga-chapter"><a href="https://mangasnosekai.com/manga/x/capitulo-{n}/">'
+        f'<span class="chapter-title">Cap. {n}</span></a><span class="chapter-release-date"><i>marzo 1, 2024</i></span></li>'
+        for n in nums)
+    main = (f'<div class="c-page-content"><div class="listing-chapters_wrap"><ul class="chapter-list version-chap">'
+            f'{items}</ul></div></div>{noise}')
+    return PAGE.format(title="Manga X – MangasNoSekai", body_class="wp-manga-template-default", main=main)
+
+def animebbg(nums, noise=""):
+    items = "\n".join(
+        f'<div class="structItem structItem--resource"><div class="structItem-title">'
+        f'<a href="/comics/amistad-rota.4640/capitulos/capitulo-{n}.{9000 + i}/">Capítulo {n}</a></div>'
+        f'<div class="structItem-minor"><a href="/members/uploader.1/">uploader</a></div></div>'
+        for i, n in enumerate(nums))
+    main = f'<div class="block-container"><div class="structItemContainer">{items}</div></div>{noise}'
+    return PAGE.format(title="Amistad rota - Capítulos | AnimeBBG", body_class="p-body", main=main)
+
+def zonatmo(nums, noise=""):
+    items = "\n".join(
+        f'<li class="list-group-item p-0 bg-light upload-link"><h4 class="px-2 py-3 m-0">'
+        f'<a class="btn-collapse" onclick="collapseChapter(\'x{i}\')"> Capítulo {float(n):.2f} : El regreso</a></h4>'
+        f'<a href="https://zonatmo.com/view_uploads/{700000 + i}" class="btn btn-default btn-sm">Ver</a></li>'
+        for i, n in enumerate(nums))
+    main = f'<div class="card chapters"><ul class="list-group list-group-flush">{items}</ul></div>{noise}'
+    return PAGE.format(title="Manga X - ZonaTMO", body_class="", main=main)
+
+SITES = {
+    "bokugents": bokugents,
+    "m440": m440,
+    "mangasnosekai": mangasnosekai,
+    "animebbg": animebbg,
+    "zonatmo": zonatmo,
+}
+
+NOMATCH = PAGE.format(
+    title="Página no encontrada",
+    body_class="error404",
+    main='<h1>404</h1><p>Lo sentimos, no encontramos la obra.</p><a href="/">Volver</a> <a href="/buscar/">Buscar</a>',
+)
+
+ANTIBOT_EN = """<!DOCTYPE html><html lang="en-US"><head><title>Just a moment...</title>
+<meta http-equiv="refresh" content="390"></head><body class="no-js">
+<div class="main-wrapper" role="main"><div class="main-content"><h1 class="zone-name-title h1">example.com</h1>
+<h2 class="h2" id="challenge-running">Checking if the site connection is secure</h2>
+<div id="challenge-stage"></div><noscript><div id="challenge-error-title">Enable JavaScript and cookies to continue</div></noscript>
+</div></div><script>(function(){window._cf_chl_opt={cvId: '3',cZone: 'example.com'};
+var a = document.createElement('script');a.src = '/cdn-cgi/challenge-platform/h/g/orchestrate/chl_page/v1?ray=8a';
+window.__cf_chl_captcha_tk__ = 1;document.getElementsByTagName('head')[0].appendChild(a);}());</script></body></html>
+"""
+
+ANTIBOT_ES = """<!DOCTYPE html><html lang="es"><head><title>Un momento…</title></head>
+<body><div class="main-wrapper"><h1>bokugents.com</h1>
+<h2 id="challenge-running">Comprobando tu navegador antes de acceder a bokugents.com.</h2>
+<p>Por favor habilita JavaScript y las Cookies para continuar.</p>
+<div id="cf-please-wait"></div></div></body></html>
+"""
+
+# Página normal que un matcher por palabras sueltas marcaría: "Un momento" en el título de
+# la obra y en comentarios, widget de hCaptcha en el formulario y el aviso de <noscript>
+UN_MOMENTO_NOISE = """
+<div class="comment"><a href="/user/12/">usuario12</a> <p>Un momento... ¿el prota sigue vivo?</p></div>
+<form id="comentar"><div class="h-captcha" data-sitekey="x"></div>
+<script src="https://js.hcaptcha.com/1/api.js" async defer></script></form>
+<noscript>Please enable JavaScript and cookies to comment.</noscript>
+"""
+
+# Challenge sin marcadores conocidos en el HTML: solo lo delatan el status y los headers
+CF_MITIGATED = """<!DOCTYPE html><html lang="es"><head><title>bokugents.com</title></head>
+<body><div id="turnstile-wrapper"></div><script src="/v1/api.js"></script></body></html>
+"""
+CF_MITIGATED_RESPONSE = {"status": 403, "headers": {"server": "cloudflare", "cf-mitigated": "challenge"}}
+
+def _write(path: str, html: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if path.endswith(".gz"):
+        # mtime=0: el gzip es byte a byte reproducible
+        with gzip.GzipFile(path, "wb", mtime=0) as fh:
+            fh.write(html.encode("utf-8"))
+    else:
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(html)
+
+def main():
+    rng = random.Random(440)
+    cases = []
+
+    for site, tpl in SITES.items():
+        # Normal: ~40 capítulos con un decimal arriba del todo
+        nums = _chapters(40, extras=("40.5",))
+        _write(os.path.join(FIXTURES, site, "normal.html"), tpl(nums, _comments(rng, 15)))
+        cases.append({"file": f"{site}/normal.html", "site": site, "chapter": "40.5", "antibot": False})
+
+        # Enorme: 1000 capítulos (+ decimales) y miles de anchors de ruido
+        extras = tuple(f"{i}.5" for i in range(1, 1000, 7))
+        nums = _chapters(1000, extras=extras)
+        _write(os.path.join(FIXTURES, site, "huge.html.gz"), tpl(nums, _comments(rng, 3000)))
+        cases.append({"file": f"{site}/huge.html.gz", "site": site, "chapter": "1000", "antibot": False})
+
+        _write(os.path.join(FIXTURES, site, "nomatch.html"), NOMATCH)
+        cases.append({"file": f"{site}/nomatch.html", "site": site, "chapter": None, "antibot": False})
+
+    for name, html in (("cloudflare_en.html", ANTIBOT_EN), ("cloudflare_es.html", ANTIBOT_ES)):
+        _write(os.path.join(FIXTURES, "antibot", name), html)
+        for site in SITES:
+            cases.append({"file": f"antibot/{name}", "site": site, "chapter": None, "antibot": True})
+
+    # Falso positivo del matcher anterior: tiene que dar capítulo y no anti-bot
+    html = bokugents(_chapters(40, extras=("40.5",)), UN_MOMENTO_NOISE).replace(
+        "<title>A Rank Party – Bokugents</title>", "<title>Un momento de calma – Bokugents</title>")
+    _write(os.path.join(FIXTURES, "antibot", "un_momento.html"), html)
+    cases.append({"file": "antibot/un_momento.html", "site": "bokugents", "chapter": "40.5", "antibot": False})
+
+    _write(os.path.join(FIXTURES, "antibot", "cf_mitigated.html"), CF_MITIGATED)
+    for site in SITES:
+        # Copia por caso: con el mismo dict yaml escribiría anchors (&id001)
+        cases.append({"file": "antibot/cf_mitigated.html", "site": site, "chapter": None, "antibot": True,
+                      **copy.deepcopy(CF_MITIGATED_RESPONSE)})
+
+    with open(os.path.join(FIXTURES, "expected.yaml"), "w", encoding="utf-8") as fh:
+        yaml.safe_dump({"cases": cases}, fh, allow_unicode=True, sort_keys=False)
+    print(f"{len(cases)} casos escritos en {FIXTURES}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+CLI unificado:
+  python cli.py check <nombre|url> [--file pagina.html | --snapshot] [--backend http|playwright|auto]
+  python cli.py run [--shard i/N | --merge | --daemon ...]   (lo mismo que main.py)
+  python cli.py validate | dedupe
+  python cli.py bench parsers|config|imports [args...]
+
+Cada subcomando importa solo lo que usa (ver COMMANDS): `check` con --file/--snapshot no
+carga requests ni Playwright, `validate`/`dedupe` solo la config y el store. El tiempo de
+import de cada uno se mide con `bench imports` contra el presupuesto de COMMANDS.
+"""
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# --- check ---------------------------------------------------------------------
+
+def _find(query: str):
+    """Serie de series.yaml por URL (normalizada) o por parte del nombre; si no está y es URL, una suelta."""
+    from scraper.config import SERIES_FILE, Series, load_series, normalize_url
+
+    series = load_series(SERIES_FILE)
+    if query.startswith(("http://", "https://")):
+        norm = normalize_url(query)
+        found = [s for s in series if s.norm_url == norm]
+        return found[:1] or [Series(query, query)]
+    q = query.lower()
+    exact = [s for s in series if s.name.lower() == q]
+    return exact or [s for s in series if q in s.name.lower()]
+
+def _check(argv: List[str]) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="cli.py check", description="Revisa una sola serie sin tocar el store.")
+    ap.add_argument("series", help="nombre (o parte) o URL")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--file", help="parsea este HTML local en vez de descargar")
+    src.add_argument("--snapshot", action="store_true", help="parsea la última página guardada en SNAPSHOT_DIR")
+    ap.add_argument("--backend", choices=("http", "playwright", "auto"), help="FETCH_BACKEND para esta revisión")
+    args = ap.parse_args(argv)
+
+    found = _find(args.series)
+    if len(found) != 1:
+        print(f"[check] '{args.series}': {len(found)} series coinciden" + (":" if found else ""))
+        for s in found:
+            print(f"  - {s.name}  {s.url}")
+        return 2
+    s = found[0]
+
+    from scraper import store
+    from scraper.sites import get_parser_for_url, get_wait_selector_for_url
+    from scraper.utils import comparable_tuple, sane_chapter_for_update
+
+    parser = get_parser_for_url(s.url)
+    prev = store.current_chapter(s.url)
+    store.close(commit=False)
+    print(f"==> {s.name}\n   {s.url}  parser={parser.name}  store={prev}")
+
+    t0 = time.perf_counter()
+    if args.file or args.snapshot:
+        if args.file:
+            import gzip
+
+            opener = gzip.open if args.file.endswith(".gz") else open
+            with opener(args.file, "rt", encoding="utf-8", errors="replace") as fh:
+                html = fh.read()
+        else:
+            from scraper import snapshots
+
+            entry = snapshots.latest(s.name)
+            if entry is None:
+                print(f"[check] no hay snapshots de '{s.name}' (corre check sin --snapshot primero)")
+                return 1
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["ts"]))
+            print(f"   snapshot {entry['hash'][:12]} ({entry['engine']}, {entry['outcome']}, {when})")
+            html = snapshots.load(entry)
+        reason = None
+        t1 = time.perf_counter()
+        cur = parser(html)
+    else:
+        if args.backend:
+            os.environ["FETCH_BACKEND"] = args.backend
+        # Sin huella: al tocar un parser se quiere ver lo que parsea, no lo guardado
+        os.environ["FINGERPRINT"] = "0"
+        os.environ.setdefault("TRACE", "0")
+        from scraper.backends import FETCH_BACKEND, fetch_and_parse
+        from scraper.http_fetch import close_session
+
+        try:
+            html, _, reason, cur = fetch_and_parse(s.url, parser, wait_selector=get_wait_selector_for_url(s.url),
+                                                   series_name=s.name)
+        finally:
+            close_session()
+            from scraper.browser_pool import shutdown_pool
+            shutdown_pool()
+        t1 = time.perf_counter()
+        print(f"   backend={FETCH_BACKEND}  {len(html)} bytes")
+    t2 = time.perf_counter()
+
+    if reason:
+        verdict = f"anti-bot ({reason})"
+    elif cur is None:
+        verdict = "sin match"
+    elif prev is None:
+        verdict = "init"
+    elif not sane_chapter_for_update(prev, cur):
+        verdict = f"keep (salto sospechoso desde {prev})"
+    elif comparable_tuple(cur) > comparable_tuple(prev):
+        verdict = f"update ({prev} → {cur})"
+    else:
+        verdict = "ok"
+    print(f"   capítulo={cur}  {verdict}")
+    print(f"   {'lectura' if (args.file or args.snapshot) else 'fetch+parse'} {(t1 - t0) * 1000:.0f} ms, total {(t2 - t0) * 1000:.0f} ms")
+    return 0 if cur is not None else 1
+
+def _load_check() -> Callable[[List[str]], int]:
+    import scraper.config  # noqa: F401
+    import scraper.sites  # noqa: F401
+    import scraper.store  # noqa: F401
+    return _check
+
+# --- el resto ------------------------------------------------------------------
+
+def _load_run() -> Callable[[List[str]], int]:
+    import main
+    return main.main
+
+def _script(module: str) -> Callable[[], Callable[[List[str]], int]]:
+    def load():
+        mod = __import__(module)
+
+        def run(argv: List[str]) -> int:
+            mod.main()
+            return 0
+        return run
+    return load
+
+BENCHES = ("parsers", "config", "imports")
+
+def _bench(argv: List[str]) -> int:
+    import runpy
+
+    if not argv or argv[0] not in BENCHES:
+        print(f"Uso: python cli.py bench {'|'.join(BENCHES)} [args...]")
+        return 2
+    path = os.path.join(ROOT, "bench", f"bench_{argv[0]}.py")
+    sys.argv = [path] + argv[1:]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        return int(e.code or 0)
+    return 0
+
+def _load_bench() -> Callable[[List[str]], int]:
+    return _bench
+
+# nombre -> (ayuda, carga perezosa del handler, presupuesto de import en ms)
+COMMANDS: Dict[str, Tuple[str, Callable[[], Callable[[List[str]], int]], float]] = {
+    "check": ("revisa una serie (o parsea un HTML/snapshot) sin tocar el store", _load_check, 150),
+    "run": ("corrida completa, como main.py", _load_run, 400),
+    "validate": ("valida y depura series.yaml", _script("validate_series"), 80),
+    "dedupe": ("deduplica series.yaml por URL", _script("dedupe_series"), 80),
+    "bench": ("benchmarks en bench/", _load_bench, 20),
+}
+
+def load(name: str) -> Callable[[List[str]], int]:
+    return COMMANDS[name][1]()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print("Uso: python cli.py <subcomando> [args...]\n")
+        for name, (text, _, _) in COMMANDS.items():
+            print(f"  {name:<9} {text}")
+        return 0 if argv[:1] in (["-h"], ["--help"]) else 2
+    return load(argv[0])(argv[1:])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,39 @@
 # -*- coding: utf-8 -*-
+import argparse
 import os
-import sys
+import signal
+import threading
 import time
-from typing import Dict, Any, List, Optional, Tuple
+import sys
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 
 from scraper.utils import (
-    load_yaml, save_yaml, yprint, comparable_tuple, sanitize_chapter,
+    yprint, comparable_tuple, sanitize_chapter,
     sane_chapter_for_update, fmt_series_line
 )
-from scraper.fetchers import fetch_html
-from scraper.discord import send_discord_message
+from scraper.config import Series, load_series
+from scraper.backends import FETCH_BACKEND, fetch_and_parse, parses_raw_html, save_tiers
+from scraper.http_fetch import close_session
+from scraper.fetchers import READY
+from scraper import daemon as daemon_mod
+from scraper import (
+    budget, engines, feeds, fingerprint, netfilter, parsepool, ratelimit, schedule, shard, snapshots, store, trace
+)
+from scraper.browser_pool import shutdown_pool
+from scraper.discord import send_discord_message, close_session as close_discord
 from scraper.sites import get_parser_for_url, get_wait_selector_for_url
 
 SERIES_FILE = "series.yaml"
-SLEEP_BETWEEN = float(os.getenv("SCRAPE_SLEEP", "0.6"))
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "sync").lower()
+CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+PER_HOST = int(os.getenv("SCRAPE_PER_HOST", "1"))
+DISCORD_MODE = os.getenv("DISCORD_MODE", "full").lower()
+
+Result = Tuple[str, str, Optional[str], Optional[str], str]
+# Con la etapa de parse, un Pending cuyo result() es la tupla
+Outcome = Union[Result, parsepool.Pending]
 
 def _url_looks_bad(u: str) -> Optional[str]:
     if not (u.startswith("http://") or u.startswith("https://")):
@@ -28,34 +46,31 @@ def _url_looks_bad(u: str) -> Optional[str]:
     return None
 
 def _title_of(html: str) -> str:
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(html, "html.parser")
         return (soup.title.string or "").strip()
     except Exception:
         return ""
 
-def process_series_entry(entry: Dict[str, Any]) -> Tuple[str, str, Optional[str], Optional[str], str]:
-    name = entry["name"].strip()
-    url  = entry["url"].strip()
-    prev = str(entry.get("chapter") or "").strip() or None
-
-    bad = _url_looks_bad(url)
-    if bad:
-        yprint(f"   [info] URL inválida: {bad}")
-        return name, url, prev, prev or "0", "info"
-
-    parser = get_parser_for_url(url)
-    wait_selector = get_wait_selector_for_url(url)
-
-    html, nav_title, antibot_reason = fetch_html(url, wait_selector=wait_selector, timeout_ms=30000, series_name=name)
+def _entry_fields(entry: Series) -> Tuple[str, str, Optional[str]]:
+    return entry.name, entry.url, store.current_chapter(entry.url)
 
+def _evaluate(name: str, url: str, prev: Optional[str], html: str, nav_title: str,
+              antibot_reason: Optional[str], cur: Optional[str]) -> Tuple[str, str, Optional[str], Optional[str], str]:
+    """
+    Convierte el resultado de un fetch en (name, url, prev, cur, status). antibot_reason es
+    el motivo de fallo del fetch: solo los "<motor>/antibot:<motivo>" son anti-bot; el resto
+    (http/404, http/ConnectionError, chromium/TimeoutError) son errores de descarga.
+    """
     if antibot_reason:
-        yprint(f"   [diag] página protegida por anti-bot ({antibot_reason}). Título='{nav_title or _title_of(html)}', len={len(html)}")
+        what = "página protegida por anti-bot" if "/antibot:" in antibot_reason else "descarga fallida"
+        yprint(f"   [diag] {what} ({antibot_reason}). Título='{nav_title or _title_of(html)}', len={getattr(html, 'html_len', len(html))}")
         return name, url, prev, prev or "0", "info"
 
-    cur  = parser(html)
     if cur is None:
-        yprint(f"   [diag] parser sin match. Título='{nav_title or _title_of(html)}', len={len(html)}")
+        yprint(f"   [diag] parser sin match. Título='{nav_title or _title_of(html)}', len={getattr(html, 'html_len', len(html))}")
         return name, url, prev, prev or "0", "info"
 
     if prev is None:
@@ -69,53 +84,286 @@ def process_series_entry(entry: Dict[str, Any]) -> Tuple[str, str, Optional[str]
 
     return name, url, prev, prev, "ok"
 
-def main() -> int:
-    cfg = {
-        "FETCH_BACKEND": os.getenv("FETCH_BACKEND", "playwright"),
-        "HTTPS_PROXY": os.getenv("HTTPS_PROXY", "unset"),
-        "HTTP_PROXY": os.getenv("HTTP_PROXY", "unset"),
-    }
-    yprint(f"[cfg] FETCH_BACKEND='{cfg['FETCH_BACKEND']}'  HTTPS_PROXY={cfg['HTTPS_PROXY']}  HTTP_PROXY={cfg['HTTP_PROXY']}")
+def process_series_entry(entry: Series, stage: Optional[parsepool.ParseStage] = None) -> Outcome:
+    """
+    Revisa una serie. Con `stage` (scraper.parsepool) el parse puede seguir en un worker:
+    entonces devuelve un Pending cuyo result() es la tupla (ver _drain).
+    """
+    name, url, prev = _entry_fields(entry)
 
-    data = load_yaml(SERIES_FILE)
-    series: List[Dict[str, Any]] = data.get("series", [])
+    bad = _url_looks_bad(url)
+    if bad:
+        yprint(f"   [info] URL inválida: {bad}")
+        return name, url, prev, prev or "0", "info"
 
-    results = []
-    changed = False
+    parser = get_parser_for_url(url)
+    wait_selector = get_wait_selector_for_url(url)
+
+    with trace.series(name, url) as rec:
+        html, nav_title, antibot_reason, cur = fetch_and_parse(url, parser, wait_selector=wait_selector,
+                                                               series_name=name, stage=stage, series_idx=entry.idx)
+        if isinstance(cur, parsepool.Pending):
+            rec["parse"] = "pool"
+            # El span 'series' sale cuando se sabe el status (al resolver el Pending)
+            emit = trace.defer()
+        else:
+            result = _evaluate(name, url, prev, html, nav_title, antibot_reason, cur)
+            rec["status"] = result[4]
+
+    if isinstance(cur, parsepool.Pending):
+        fetch_ms = rec["ms"]
+
+        def finish(chapter: Optional[str]) -> Result:
+            result = _evaluate(name, url, prev, html, nav_title, antibot_reason, chapter)
+            emit(status=result[4])
+            budget.observe(url, fetch_ms, result[4])
+            return result
+
+        def failed(e: BaseException) -> None:
+            emit(status="error", error=type(e).__name__)
+        return cur.then(finish, on_error=failed)
+    budget.observe(url, rec["ms"], result[4])
+    return result
+
+async def process_series_entry_async(entry: Series, pool) -> Tuple[str, str, Optional[str], Optional[str], str]:
+    from scraper.backends import fetch_and_parse_async
+
+    name, url, prev = _entry_fields(entry)
+
+    bad = _url_looks_bad(url)
+    if bad:
+        yprint(f"   [info] URL inválida ({name}): {bad}")
+        return name, url, prev, prev or "0", "info"
+
+    parser = get_parser_for_url(url)
+    wait_selector = get_wait_selector_for_url(url)
+
+    with trace.series(name, url) as rec:
+        html, nav_title, antibot_reason, cur = await fetch_and_parse_async(pool, url, parser, wait_selector=wait_selector,
+                                                                           series_name=name, series_idx=entry.idx)
+        result = _evaluate(name, url, prev, html, nav_title, antibot_reason, cur)
+        rec["status"] = result[4]
+    budget.observe(url, rec["ms"], result[4])
+    return result
+
+def _from_feed(entry: Series, cur: str) -> Tuple[str, str, Optional[str], Optional[str], str]:
+    """Resultado de una serie resuelta con el feed de su host (scraper.feeds)."""
+    name, url, prev = _entry_fields(entry)
+    return _evaluate(name, url, prev, "", "", None, cur)
+
+def _not_due(entry: Series) -> Tuple[str, str, Optional[str], Optional[str], str]:
+    name, url, prev = _entry_fields(entry)
+    return name, url, prev, prev or "0", "skip"
+
+def _cut(entry: Series) -> Tuple[str, str, Optional[str], Optional[str], str]:
+    """Serie que no se alcanzó a revisar antes de que se acabara RUN_BUDGET_MIN."""
+    name, url, prev = _entry_fields(entry)
+    return name, url, prev, prev or "0", "cut"
+
+async def _run_async(series: List[Series], pool=None) -> Tuple[Dict[int, str], List[Any]]:
+    """
+    Procesa todas las series concurrentemente:
+      - primero los feeds por host (scraper.feeds); las series que resuelven no se descargan
+      - SCRAPE_CONCURRENCY series a la vez como máximo (global)
+      - SCRAPE_PER_HOST series a la vez por host (el ritmo por host lo marca scraper.ratelimit)
+      - las que consiguen turno después de agotado el presupuesto de la corrida salen como "cut"
+    Devuelve ({idx: capítulo} del feed, y en el orden original de las demás la tupla de
+    process_series_entry o la excepción). Si recibe `pool` (daemon) no lo cierra.
+    """
+    import asyncio
+    from scraper.async_fetchers import AsyncBrowserPool
+
+    owned = pool is None
+    if owned:
+        pool = AsyncBrowserPool()
+    global_sem = asyncio.Semaphore(max(1, CONCURRENCY))
+    host_sems: Dict[str, asyncio.Semaphore] = {}
+
+    async def one(entry: Series):
+        host_sem = host_sems.setdefault(entry.host, asyncio.Semaphore(max(1, PER_HOST)))
+        async with host_sem:
+            async with global_sem:
+                if budget.expired():
+                    return _cut(entry)
+                try:
+                    return await process_series_entry_async(entry, pool)
+                except Exception as e:
+                    return e
+
+    try:
+        feed_hits = await feeds.resolve_async(series, pool)
+        rest = [s for s in series if s.idx not in feed_hits]
+        return feed_hits, await asyncio.gather(*(one(s) for s in rest))
+    finally:
+        if owned:
+            launches = await pool.close()
+            if launches:
+                yprint(f"[pool] navegadores lanzados: {launches}")
+
+def _record(s: Series, outcome, results: List[Dict[str, Any]], via: Optional[str] = None) -> None:
+    """Loguea el resultado de una serie y lo agrega a results (los cambios al store los hace _apply)."""
+    if isinstance(outcome, Exception):
+        yprint(f"   [skip] error: {outcome}")
+        budget.observe(s.url, None, "error")
+        results.append({"idx": s.idx, "name": s.name, "url": s.url,
+                        "prev": None, "cur": None, "status": "error", "ts": time.time(),
+                        "error": f"{type(outcome).__name__}: {outcome}"})
+        return
+
+    name, url, prev, cur, status = outcome
+    if status == "init":
+        yprint(f"   [init] last_chapter = {cur}")
+    elif status == "update":
+        yprint(f"   [update] {prev} → {cur}")
+    elif status == "ok":
+        yprint(f"   [ok] sin cambios (cap {cur})")
+    elif status == "keep":
+        yprint(f"   [keep] {prev} (ignorado {cur})")
+    elif status == "skip":
+        pass  # el motivo ya se logueó al planificar
+    elif status == "cut":
+        yprint("   [cut] sin tiempo (RUN_BUDGET_MIN); queda para la próxima corrida")
+    else:
+        yprint("   [info] no se detectó capítulo válido")
+
+    fp, fp_hit = fingerprint.take((s.idx, url))
+    row = {"idx": s.idx, "name": name, "url": url, "prev": prev, "cur": cur,
+           "status": status, "ts": time.time(), "fp": fp, "fp_hit": fp_hit}
+    if via:
+        row["via"] = via
+    results.append(row)
 
-    for idx, s in enumerate(series, 1):
-        yprint(f"==> {s['name']}")
+def _drain(parsing: Deque[Tuple[Series, parsepool.Pending]], results: List[Dict[str, Any]],
+           wait: bool = False) -> None:
+    """Registra, en el orden en que se encolaron, las series cuyo parse ya terminó (wait: todas)."""
+    while parsing and (wait or parsing[0][1].done()):
+        s, pending = parsing.popleft()
+        yprint(f"==> {s.name} (parse)")
         try:
-            name, url, prev, cur, status = process_series_entry(s)
+            outcome = pending.result()
         except Exception as e:
-            yprint(f"   [skip] error: {e}")
-            continue
+            outcome = e
+        _record(s, outcome, results)
 
-        if status == "init":
-            yprint(f"   [init] last_chapter = {cur}")
-            s["chapter"] = cur
-            changed = True
-        elif status == "update":
-            yprint(f"   [update] {prev} → {cur}")
-            s["chapter"] = cur
+def _apply(results: List[Dict[str, Any]]) -> bool:
+    """Lleva los resultados al store en una transacción. Devuelve True si cambió algún capítulo."""
+    changed = False
+    for r in results:
+        status = r["status"]
+        if status in ("skip", "cut"):
+            continue
+        store.record_fetch(r["url"], status, chapter=r["cur"] if status not in ("info", "error") else None,
+                           error=r.get("error"), ts=r["ts"])
+        if status in ("init", "update"):
+            store.set_chapter(r["url"], r["name"], r["cur"], ts=r["ts"])
             changed = True
-        elif status == "ok":
-            yprint(f"   [ok] sin cambios (cap {cur})")
-        elif status == "keep":
-            yprint(f"   [keep] {prev} (ignorado {cur})")
-        else:
-            yprint("   [info] no se detectó capítulo válido")
+        # Sin descargar la página no hay huella nueva: si el feed no trajo cambios se deja la guardada
+        if status in ("init", "update", "ok") and not (r.get("via") == "feed" and status == "ok"):
+            store.set_fingerprint(r["url"], r.get("fp"))
+    store.commit()
+    return changed
+
+def _scrape(series: List[Series], plan: List[Tuple[bool, str]],
+            runtime: Optional[daemon_mod.WarmRuntime] = None) -> List[Dict[str, Any]]:
+    """
+    Revisa las series según el plan del scheduler y devuelve sus resultados (en el orden de
+    series.yaml). Las que tocan se procesan en el orden de budget.order: las lentas o que
+    vienen fallando al final, para que sean ellas las que se queden sin tiempo.
+    Con `runtime` (daemon) los navegadores quedan abiertos al terminar.
+    """
+    results: List[Dict[str, Any]] = []
+    budget.start()
+    for s, (due, why) in zip(series, plan):
+        if not due:
+            yprint(f"==> {s.name}")
+            yprint(f"   [not due] {why}")
+            _record(s, _not_due(s), results)
+    queue = budget.order([s for s, (due, _) in zip(series, plan) if due])
 
-        results.append({"name": name, "cur": cur, "status": status})
+    if SCRAPE_MODE == "async":
+        yprint(f"[cfg] SCRAPE_MODE=async  concurrencia={CONCURRENCY}  por_host={PER_HOST}")
+        if not queue:
+            feed_hits, fetched = {}, []
+        elif runtime is not None:
+            feed_hits, fetched = runtime.run_async(lambda pool: _run_async(queue, pool))
+        else:
+            import asyncio
+            feed_hits, fetched = asyncio.run(_run_async(queue))
+        outcomes = iter(fetched)
+        for s in queue:
+            yprint(f"==> {s.name}")
+            if s.idx in feed_hits:
+                yprint(f"   [feed] cap {feed_hits[s.idx]} según el feed del host")
+                _record(s, _from_feed(s, feed_hits[s.idx]), results, via="feed")
+            else:
+                _record(s, next(outcomes), results)
+    else:
+        # Sin HTML crudo que parsear no se levantan workers (ver backends.parses_raw_html)
+        stage = parsepool.stage() if parses_raw_html() else None
+        if stage is None and parsepool.PARSE_WORKERS:
+            yprint("[cfg] PARSE_WORKERS sin efecto: con IN_PAGE_EXTRACT=1 el parse va en el hilo "
+                   "(solo FETCH_BACKEND=http o IN_PAGE_EXTRACT=0 usan la etapa de parse)")
+        parsing: Deque[Tuple[Series, parsepool.Pending]] = deque()
+        try:
+            feed_hits = feeds.resolve(queue)
+            for s in queue:
+                _drain(parsing, results)
+                yprint(f"==> {s.name}")
+                if s.idx in feed_hits:
+                    yprint(f"   [feed] cap {feed_hits[s.idx]} según el feed del host")
+                    _record(s, _from_feed(s, feed_hits[s.idx]), results, via="feed")
+                    continue
+                if budget.expired():
+                    _record(s, _cut(s), results)
+                    continue
+                try:
+                    outcome = process_series_entry(s, stage)
+                except Exception as e:
+                    outcome = e
+                if isinstance(outcome, parsepool.Pending):
+                    yprint("   [parse] en cola")
+                    parsing.append((s, outcome))
+                else:
+                    _record(s, outcome, results)
+            _drain(parsing, results, wait=True)
+        finally:
+            if runtime is None:
+                parsepool.shutdown()
+                launches = shutdown_pool()
+                if launches:
+                    yprint(f"[pool] navegadores lanzados: {launches}")
+    results.sort(key=lambda r: r["idx"])
 
-        # Pausa para no disparar anti-bot por ráfagas
-        time.sleep(SLEEP_BETWEEN)
+    close_session()
+    engines.save_engine_stats()
+    removed, freed = snapshots.evict()
+    if removed:
+        yprint(f"[snapshots] retención: {removed} entradas borradas, {freed // 1024} KB liberados")
+    yprint(f"[rate] intervalo por host (s): {ratelimit.save_rates()}")
+    yprint(f"[budget] timeout por host (ms): {budget.save([s.url for s in series])}")
+    engine_lines = engines.summary_lines()
+    if engine_lines:
+        yprint("[engines] aciertos por host en esta corrida:")
+        for line in engine_lines:
+            yprint(line)
+    if READY.waits:
+        yprint(f"[ready] {READY.summary()}")
+    if parsepool.STATS.parsed:
+        yprint(f"[parse] {parsepool.STATS.summary()}")
+    if netfilter.STATS.allowed or netfilter.STATS.blocked:
+        yprint(f"[net] {netfilter.STATS.summary()}")
+    if FETCH_BACKEND == "auto":
+        yprint(f"[tier] nivel por host: {save_tiers()}")
+    return results
 
+def _summary(results: List[Dict[str, Any]]) -> None:
     updates = [r for r in results if r["status"] == "update"]
     inits   = [r for r in results if r["status"] == "init"]
     oks     = [r for r in results if r["status"] == "ok"]
     keeps   = [r for r in results if r["status"] == "keep"]
     infos   = [r for r in results if r["status"] == "info"]
+    skips   = [r for r in results if r["status"] == "skip"]
+    cuts    = [r for r in results if r["status"] == "cut"]
 
     yprint("\nResumen:")
     yprint(f"  Actualizados: {len(updates)}")
@@ -123,27 +371,210 @@ def main() -> int:
     yprint(f"  Sin actualización: {len(oks)}")
     yprint(f"  Mantenidos (keep): {len(keeps)}")
     yprint(f"  Info: {len(infos)}")
+    yprint(f"  No tocaba (not due): {len(skips)}")
+    if cuts:
+        yprint(f"  Sin tiempo (RUN_BUDGET_MIN): {len(cuts)}")
+        for r in cuts:
+            yprint(f"    - {r['name']}")
+
+    via_feed = sum(1 for r in results if r.get("via") == "feed")
+    if via_feed:
+        yprint(f"  Resueltas con el feed del host (sin fetch propio): {via_feed}")
 
-    # Discord
-    lines = [fmt_series_line(r["name"], r["cur"], r["status"]) for r in results]
-    body = "**Estado de tus series**\n" + "\n".join(lines)
+    fps = [r for r in results if r.get("fp")]
+    if fps:
+        hits = sum(1 for r in fps if r.get("fp_hit"))
+        yprint(f"  Huella sin cambios (parse evitado): {hits}/{len(fps)} ({100 * hits // len(fps)}%)")
+
+def _notify(results: List[Dict[str, Any]], changed: bool, mode: str = DISCORD_MODE) -> None:
+    # Discord (los errores no tienen capítulo que mostrar; quedan en el log y en el store)
+    if mode == "changes":
+        shown = [r for r in results if r["status"] in ("update", "init")]
+        title = "**Capítulos nuevos**"
+    else:
+        shown = [r for r in results if r["status"] != "error"]
+        title = "**Estado de tus series**"
+    lines = [fmt_series_line(r["name"], r["cur"], r["status"]) for r in shown]
+    body = title + "\n" + "\n".join(lines)
 
     webhook = os.getenv("DISCORD_WEBHOOK")
-    if webhook:
+    if not webhook:
+        yprint("[info] DISCORD_WEBHOOK no definido; no se envía a Discord.")
+    elif not shown:
+        yprint("[info] DISCORD_MODE=changes y no hubo capítulos nuevos; no se envía a Discord.")
+    else:
         ok = send_discord_message(webhook, body)
+        close_discord()
         if not ok:
             yprint("[warn] Discord no respondió OK (activa DISCORD_DEBUG=1 para ver el error).")
+
+    # En Actions, el paso siguiente del workflow commitea state.db solo si hubo capítulos nuevos
+    gh_output = os.getenv("GITHUB_OUTPUT")
+    if gh_output:
+        with open(gh_output, "a", encoding="utf-8") as fh:
+            fh.write(f"changed={'true' if changed else 'false'}\n")
+
+def merge(results_dir: str) -> int:
+    """Junta los parciales de los shards, actualiza el store y manda un solo resumen."""
+    results, heads, missing = shard.load_partials(results_dir)
+    if not heads:
+        yprint(f"[merge] no hay resultados parciales en {results_dir}")
+        return 1
+    yprint(f"[merge] {len(heads)}/{heads[0]['count']} shards, {len(results)} series")
+    if missing:
+        yprint(f"[warn] faltan shards: {missing}")
+
+    store.connect()
+    store.seed_from_yaml(load_series(SERIES_FILE))
+    sweeps = [h["finished"] for h in heads if h.get("full_sweep")]
+    if sweeps and not missing:
+        schedule.mark_sweep(min(sweeps))
+    changed = _apply(results)
+    store.close()
+
+    _summary(results)
+    _notify(results, changed)
+    return 0
+
+def _check(all_series: List[Series], series: List[Series],
+           runtime: Optional[daemon_mod.WarmRuntime] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    """Abre el store, planifica y revisa `series`. Devuelve (resultados, fue pasada completa)."""
+    store.connect()
+    seeded = store.seed_from_yaml(all_series)
+    if seeded:
+        yprint(f"[store] {seeded} capítulos migrados desde {SERIES_FILE} a {store.STATE_DB}")
+
+    full_sweep = schedule.start_run()
+    plan = [schedule.is_due(s.url) for s in series]
+    n_due = sum(1 for due, _ in plan if due)
+    yprint(f"[schedule] {'pasada completa' if full_sweep else 'incremental'}: {n_due}/{len(series)} series tocan")
+
+    results = _scrape(series, plan, runtime)
+    if full_sweep and any(r["status"] == "cut" for r in results):
+        schedule.cancel_sweep()
+        full_sweep = False
+    return results, full_sweep
+
+def _report_trace() -> None:
+    trace_lines = trace.summary_lines()
+    if trace_lines:
+        yprint("\nTiempos por host (p50/p95):")
+        for line in trace_lines:
+            yprint(line)
+    if trace.trace_path():
+        yprint(f"[trace] {trace.trace_path()}")
+    trace.close()
+
+def _reset_run_stats() -> None:
+    """Contadores que el resumen muestra por corrida; en el daemon cada ciclo es una corrida."""
+    trace.reset()
+    engines.reset_run()
+    netfilter.STATS.reset()
+    READY.reset()
+    parsepool.STATS.reset()
+
+def daemon() -> int:
+    """
+    Proceso de larga vida: revisa cada DAEMON_INTERVAL_MIN minutos (las series que tocan
+    según el scheduler) con los navegadores calientes, recarga series.yaml si cambia y al
+    final de cada ciclo guarda el store y avisa a Discord (DISCORD_MODE=changes salvo que
+    se defina otro). SIGINT/SIGTERM terminan al acabar el ciclo en curso.
+    """
+    status = daemon_mod.Status()
+    server = daemon_mod.serve(status)
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    watch = daemon_mod.FileWatch(SERIES_FILE)
+    runtime = daemon_mod.WarmRuntime()
+    mode = DISCORD_MODE if os.getenv("DISCORD_MODE") else "changes"
+
+    all_series = load_series(SERIES_FILE)
+    yprint(f"[daemon] cada {daemon_mod.DAEMON_INTERVAL_S / 60:g} min, {len(all_series)} series, DISCORD_MODE={mode}")
+    reload = False
+    try:
+        while not stop.is_set():
+            if reload or watch.changed():
+                try:
+                    all_series = load_series(SERIES_FILE)
+                    status.reloaded = time.time()
+                    yprint(f"[daemon] {SERIES_FILE} recargado: {len(all_series)} series")
+                except Exception as e:
+                    yprint(f"[warn] no se pudo recargar {SERIES_FILE} ({type(e).__name__}: {e}); sigo con la lista anterior")
+
+            status.begin(len(all_series))
+            _reset_run_stats()
+            try:
+                results, _ = _check(all_series, all_series, runtime)
+                changed = _apply(results)
+                store.close()
+                _summary(results)
+                _report_trace()
+                _notify(results, changed, mode)
+                status.end(results, changed)
+            except Exception as e:
+                store.close(commit=False)
+                status.fail(e)
+                yprint(f"[daemon] el ciclo falló: {type(e).__name__}: {e}")
+
+            status.sleeping(daemon_mod.DAEMON_INTERVAL_S)
+            reload = daemon_mod.wait(stop, daemon_mod.DAEMON_INTERVAL_S, watch) == "changed"
+    finally:
+        launches = runtime.close()
+        server.shutdown()
+        yprint(f"[daemon] fin tras {status.cycles} ciclos; navegadores lanzados: {launches}")
+    return 0
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Revisa series.yaml y avisa capítulos nuevos.")
+    ap.add_argument("--shard", type=shard.parse_spec, default=None, metavar="i/N",
+                    help="solo las series del shard i de N (0 <= i < N); escribe un parcial en RESULTS_DIR")
+    ap.add_argument("--merge", action="store_true",
+                    help="junta los parciales de RESULTS_DIR, actualiza el store y avisa a Discord")
+    ap.add_argument("--results-dir", default=shard.RESULTS_DIR)
+    ap.add_argument("--daemon", action="store_true",
+                    help="queda corriendo y revisa cada DAEMON_INTERVAL_MIN minutos (ver scraper.daemon)")
+    return ap.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.merge:
+        return merge(args.results_dir)
+
+    cfg = {
+        "FETCH_BACKEND": FETCH_BACKEND,
+        "HTTPS_PROXY": os.getenv("HTTPS_PROXY", "unset"),
+        "HTTP_PROXY": os.getenv("HTTP_PROXY", "unset"),
+    }
+    yprint(f"[cfg] FETCH_BACKEND='{cfg['FETCH_BACKEND']}'  HTTPS_PROXY={cfg['HTTPS_PROXY']}  HTTP_PROXY={cfg['HTTP_PROXY']}")
+
+    if args.daemon:
+        return daemon()
+
+    all_series = load_series(SERIES_FILE)
+    series = all_series
+    if args.shard:
+        index, count = args.shard
+        series = [s for s in all_series if shard.shard_of(s.host, count) == index]
+        yprint(f"[shard] {index}/{count}: {len(series)} series, hosts {sorted({s.host for s in series})}")
+
+    results, full_sweep = _check(all_series, series)
+
+    if args.shard:
+        # El shard no toca el store: lo actualiza el merge, en un solo lugar
+        store.close(commit=False)
+        path = shard.write_partial(index, count, full_sweep, results, args.results_dir)
+        yprint(f"[shard] resultados en {path}")
+        changed = False
     else:
-        yprint("[info] DISCORD_WEBHOOK no definido; no se envía a Discord.")
+        changed = _apply(results)
+        store.close()
 
-    # Commit opcional
-    if changed and os.getenv("CI"):
-        os.system('git config user.name "github-actions[bot]"')
-        os.system('git config user.email "github-actions[bot]@users.noreply.github.com"')
-        os.system("git add series.yaml")
-        os.system('git commit -m "chore: update last_chapter [skip ci]" || true')
-        os.system("git push || true")
+    _summary(results)
+    _report_trace()
 
+    if not args.shard:
+        _notify(results, changed)
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Detección de páginas anti-bot (challenge de Cloudflare y parecidos) con puntaje.
+
+Cada señal tiene un peso y se combinan como probabilidades independientes
+(1 - Π(1 - peso)); el resultado es un Verdict con la confianza y el motivo:
+  - respuesta del documento: header cf-mitigated (seguro), status 403/429/503 de un
+    server cloudflare, status de bloqueo de cualquier otro server (débil)
+  - <title>: tiene que ser el título del challenge completo ("Just a moment...",
+    "Un momento…"); una serie que se llame "Un momento de paz" no cuenta
+  - ventana del inicio del HTML (ANTIBOT_WINDOW, default 32 KB): marcadores del
+    challenge y sus textos, todos en una sola pasada (MARKERS_RE)
+
+blocked con confianza >= ANTIBOT_THRESHOLD (default 0.7); certain con >=
+ANTIBOT_CERTAIN (default 0.95): ahí los fetchers cortan la navegación y las esperas.
+Con Playwright el status y los headers salen del evento "response" (ResponseWatch).
+"""
+import os
+import re
+from typing import Dict, List, Mapping, Optional
+
+ANTIBOT_THRESHOLD = float(os.getenv("ANTIBOT_THRESHOLD", "0.7"))
+ANTIBOT_CERTAIN = float(os.getenv("ANTIBOT_CERTAIN", "0.95"))
+WINDOW = int(os.getenv("ANTIBOT_WINDOW", "32768"))
+
+# motivo -> peso
+WEIGHTS: Dict[str, float] = {
+    "empty": 1.0,
+    "cf_mitigated": 1.0,
+    "cf_status": 0.6,
+    "block_status": 0.2,
+    "cf_title": 0.9,
+    "wait_title": 0.6,
+    "cf_chl": 0.9,
+    "cf_markup": 0.8,
+    "checking": 0.7,
+    "enable_js": 0.4,
+    "hcaptcha": 0.3,
+}
+
+BLOCK_STATUS = (403, 429, 503)
+
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
+
+# Contra el título entero (fullmatch)
+TITLE_SIGNALS = re.compile(
+    r"(?P<cf_title>(?:attention required!?|atenci[oó]n requerida)(?:\s*\|\s*cloudflare)?)"
+    r"|(?P<wait_title>(?:just a moment|un momento)\s*(?:\.\.\.|…)?)",
+    re.IGNORECASE)
+
+# Marcadores en la ventana del HTML (en minúsculas), por motivo de WEIGHTS. Son literales:
+# una alternancia de literales es mucho más rápida en `re` que patrones con partes opcionales
+MARKERS: Dict[str, tuple] = {
+    "cf_chl": ("__cf_chl_", "_cf_chl_opt", "/cdn-cgi/challenge-platform/"),
+    "cf_markup": ("cf-please-wait", "cf-error-details", "challenge-running", "challenge-stage", "challenge-form"),
+    "checking": ("checking your browser before accessing", "checking if the site connection is secure",
+                 "comprobando tu navegador antes de acceder", "comprobando su navegador antes de acceder"),
+    "enable_js": ("enable javascript and cookies", "habilita javascript y las cookies",
+                  "activa javascript y las cookies"),
+    "hcaptcha": ("hcaptcha",),
+}
+_MARKER_OF = {lit: name for name, lits in MARKERS.items() for lit in lits}
+MARKERS_RE = re.compile("|".join(re.escape(lit) for lit in sorted(_MARKER_OF, key=len, reverse=True)))
+
+class Verdict:
+    __slots__ = ("confidence", "reasons")
+
+    def __init__(self, confidence: float = 0.0, reasons: Optional[List[str]] = None):
+        self.confidence = confidence
+        self.reasons = reasons or []
+
+    @property
+    def blocked(self) -> bool:
+        return self.confidence >= ANTIBOT_THRESHOLD
+
+    @property
+    def certain(self) -> bool:
+        return self.confidence >= ANTIBOT_CERTAIN
+
+    @property
+    def reason(self) -> str:
+        """Motivos de más a menos peso, p. ej. 'cf_chl+wait_title'."""
+        return "+".join(self.reasons) or "-"
+
+    def __bool__(self) -> bool:
+        return self.blocked
+
+    def __repr__(self) -> str:
+        return f"Verdict({self.confidence:.2f}, {self.reason!r})"
+
+def title_of(html: str) -> Optional[str]:
+    m = TITLE_RE.search(html[:WINDOW])
+    return re.sub(r"\s+", " ", m.group(1)).strip() if m else None
+
+def classify(html: Optional[str], status: Optional[int] = None,
+             headers: Optional[Mapping[str, str]] = None, title: Optional[str] = None) -> Verdict:
+    """
+    html=None: todavía no hay documento (solo status/headers); "" es una página vacía.
+    Sin title se toma el <title> de la ventana del HTML.
+    """
+    found = set()
+    if headers:
+        h = {k.lower(): v for k, v in headers.items()}
+        if h.get("cf-mitigated", "").lower() == "challenge":
+            found.add("cf_mitigated")
+        if status in BLOCK_STATUS:
+            found.add("cf_status" if "cloudflare" in h.get("server", "").lower() else "block_status")
+    elif status in BLOCK_STATUS:
+        found.add("block_status")
+
+    if html is not None:
+        if not html:
+            found.add("empty")
+        else:
+            window = html[:WINDOW]
+            if title is None:
+                title = title_of(window)
+            found.update(_MARKER_OF[m.group(0)] for m in MARKERS_RE.finditer(window.lower()))
+    if title:
+        m = TITLE_SIGNALS.fullmatch(title.strip())
+        if m:
+            found.add(m.lastgroup)
+
+    if not found:
+        return Verdict()
+    miss = 1.0
+    for name in found:
+        miss *= 1.0 - WEIGHTS[name]
+    return Verdict(round(1.0 - miss, 3), sorted(found, key=lambda n: (-WEIGHTS[n], n)))
+
+class ResponseWatch:
+    """
+    Status y headers de la última respuesta de navegación del frame principal, tomados del
+    evento "response" de la página (sirve igual para la API sync y la async).
+    """
+    def __init__(self, page):
+        self.status: Optional[int] = None
+        self.headers: Dict[str, str] = {}
+        self._frame = page.main_frame
+        page.on("response", self._on_response)
+
+    def _on_response(self, response) -> None:
+        try:
+            if response.frame != self._frame or not response.request.is_navigation_request():
+                return
+            self.status = response.status
+            self.headers = dict(response.headers)
+        except Exception:
+            pass  # respuestas de service workers no tienen frame
+
+    def verdict(self, html: Optional[str] = None, title: Optional[str] = None) -> Verdict:
+        return classify(html, self.status, self.headers, title)
+
+# Título e inicio del HTML sin traer el documento entero (veredicto temprano en los fetchers)
+PEEK_JS = """(n) => ({
+  title: document.title,
+  html: document.documentElement ? document.documentElement.outerHTML.slice(0, n) : ""
+})"""
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Versión asyncio de fetch_html (API async de Playwright).
+
+Mismo contrato que scraper.fetchers.fetch_html: devuelve (html, title, antibot_reason).
+Un solo runtime y un navegador por motor para toda la corrida; cada serie
+usa su propio context, así varias series pueden navegar a la vez.
+"""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from .browser_pool import MAX_USES, LAUNCH_ARGS
+from . import antibot, budget, engines, netfilter, ratelimit, sessions, snapshots, trace
+from .sites import get_allowed_resources_for_url, get_readiness_for_url
+from .fetchers import EXTRA_HEADERS, IN_PAGE_EXTRACT, READY, SCROLL_JS, context_options, _navigated, _ready_reason
+from .sites.engine import ANCHORS_JS, FALLBACK_JS, ChapterExtractor
+from .sites.readiness import READY_JS, READY_POLL_MS, Readiness
+
+class AsyncBrowserPool:
+    def __init__(self, max_uses: int = MAX_USES):
+        self.max_uses = max(1, max_uses)
+        self._pw_cm = None
+        self._pw = None
+        self._browsers: Dict[str, object] = {}
+        self._uses: Dict[str, int] = {}
+        self._retired = []
+        self._lock = asyncio.Lock()
+        self.launches: Dict[str, int] = {}
+
+    async def _drop(self, engine: str) -> None:
+        browser = self._browsers.pop(engine, None)
+        self._uses.pop(engine, None)
+        try:
+            if browser:
+                await browser.close()
+        except Exception:
+            pass
+
+    async def browser(self, engine: str):
+        # El lock evita que dos series lancen el mismo motor a la vez
+        async with self._lock:
+            if self._pw is None:
+                from playwright.async_api import async_playwright
+
+                self._pw_cm = async_playwright()
+                self._pw = await self._pw_cm.start()
+            browser = self._browsers.get(engine)
+            if browser is not None and (not browser.is_connected()
+                                        or self._uses.get(engine, 0) >= self.max_uses):
+                # Los contexts abiertos en el navegador viejo siguen vivos hasta que
+                # sus series terminen; solo dejamos de repartirlo y se cierra en close().
+                self._retired.append(browser)
+                self._browsers.pop(engine, None)
+                self._uses.pop(engine, None)
+                browser = None
+            if browser is None:
+                with trace.span("launch", engine=engine):
+                    browser = await getattr(self._pw, engine).launch(headless=True, args=LAUNCH_ARGS)
+                self._browsers[engine] = browser
+                self._uses[engine] = 0
+                self.launches[engine] = self.launches.get(engine, 0) + 1
+            self._uses[engine] += 1
+            return browser
+
+    async def prune(self) -> None:
+        """Cierra los navegadores reciclados; solo entre corridas, sin series en curso (daemon)."""
+        for browser in self._retired:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._retired = []
+
+    async def close(self) -> Dict[str, int]:
+        for engine in list(self._browsers):
+            await self._drop(engine)
+        await self.prune()
+        if self._pw_cm is not None:
+            try:
+                await self._pw_cm.__aexit__(None, None, None)
+            except Exception:
+                pass
+        self._pw_cm = self._pw = None
+        return dict(self.launches)
+
+async def _settle_async(page, ready: Readiness, timeout_ms: int, engine: str) -> None:
+    """Equivalente async de fetchers._settle."""
+    with trace.span("settle", engine=engine) as sp:
+        await page.evaluate(SCROLL_JS)
+        try:
+            handle = await page.wait_for_function(READY_JS, arg=ready.config(), polling=READY_POLL_MS,
+                                                  timeout=min(ready.max_ms, timeout_ms))
+            sp["ready"] = await handle.json_value()
+        except Exception as e:
+            sp["ready"] = _ready_reason(e)
+    READY.add(sp["ready"], sp["ms"])
+
+async def _wait_ready_async(page, wait_selector: Optional[str], ready: Readiness, timeout_ms: int,
+                            engine: str) -> None:
+    """Equivalente async de fetchers._wait_ready."""
+    if wait_selector:
+        with trace.span("wait_selector", engine=engine):
+            try:
+                await page.wait_for_selector(wait_selector, timeout=timeout_ms)
+            except Exception:
+                pass
+    await _settle_async(page, ready, timeout_ms, engine)
+
+async def _peek_async(page) -> Dict[str, Optional[str]]:
+    """Equivalente async de fetchers._peek."""
+    try:
+        return await page.evaluate(antibot.PEEK_JS, antibot.WINDOW)
+    except Exception as e:
+        if not _navigated(e):
+            raise
+        return {"title": None, "html": None}
+
+async def _goto_async(page, watch: antibot.ResponseWatch, url: str, wait_until: str, timeout_ms: int,
+                      engine: str, stage: str,
+                      early: bool = True) -> Tuple[antibot.Verdict, Dict[str, Optional[str]]]:
+    """Equivalente async de fetchers._goto."""
+    with trace.span(stage, engine=engine) as sp:
+        t0 = time.monotonic()
+        await page.goto(url, wait_until="commit", timeout=timeout_ms)
+        verdict = watch.verdict()
+        if not (early and verdict.certain):
+            left = max(1, timeout_ms - int((time.monotonic() - t0) * 1000))
+            await page.wait_for_load_state(wait_until, timeout=left)
+        peek = await _peek_async(page)
+        verdict = watch.verdict(**peek)
+        if verdict.confidence:
+            sp["antibot"] = f"{verdict.confidence:.2f} {verdict.reason}"
+    return verdict, peek
+
+async def _capture_page_async(page, extractor: Optional[ChapterExtractor], series_name: Optional[str],
+                              engine: str) -> Tuple[str, str]:
+    """Equivalente async de fetchers._capture_page."""
+    with trace.span("capture", engine=engine) as sp:
+        html = await _capture_async(page, extractor, series_name, engine)
+        sp["bytes"] = getattr(html, "html_len", len(html))
+    return html, await page.title()
+
+async def _try_fetch_async(pool: AsyncBrowserPool, browser_name: str, url: str,
+                           wait_selector: Optional[str], timeout_ms: int,
+                           extractor: Optional[ChapterExtractor] = None,
+                           series_name: Optional[str] = None) -> Tuple[str, str, antibot.Verdict]:
+    browser = await pool.browser(browser_name)
+    stored = sessions.storage_state_for(url, browser_name)
+    ready = get_readiness_for_url(url)
+    context = await browser.new_context(storage_state=stored, **context_options(browser_name))
+    try:
+        await context.set_extra_http_headers(EXTRA_HEADERS)
+        await netfilter.install_async(context, get_allowed_resources_for_url(url))
+        page = await context.new_page()
+        watch = antibot.ResponseWatch(page)
+
+        # Primer modo
+        verdict, peek = await _goto_async(page, watch, url, "domcontentloaded", timeout_ms, browser_name, "goto")
+        if verdict.certain:
+            # Challenge seguro: no se captura el documento a medio cargar, queda lo que se vio
+            html, title = peek["html"] or "", peek["title"] or ""
+        else:
+            await _wait_ready_async(page, wait_selector, ready, timeout_ms, browser_name)
+            try:
+                html, title = await _capture_page_async(page, extractor, series_name, browser_name)
+                verdict = watch.verdict(html, title)
+            except Exception as e:
+                if not _navigated(e):
+                    raise
+                html = title = None  # navegó durante la captura: se captura en el reintento
+
+        # Segundo intento si parece anti-bot (o si la página navegó sola)
+        if html is None or verdict.blocked:
+            if stored and verdict.blocked:
+                # La sesión guardada ya no pasa el challenge
+                sessions.invalidate(url, browser_name)
+            # Sin corte temprano: el reintento está para que el challenge se resuelva solo
+            await _goto_async(page, watch, url, "networkidle", timeout_ms, browser_name, "goto_retry", early=False)
+            await _wait_ready_async(page, wait_selector, ready, timeout_ms, browser_name)
+            html, title = await _capture_page_async(page, extractor, series_name, browser_name)
+            verdict = watch.verdict(html, title)
+
+        if not verdict.blocked:
+            await sessions.save_async(context, url, browser_name)
+        return html, title, verdict
+    finally:
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+async def _capture_async(page, extractor: Optional[ChapterExtractor], series_name: Optional[str], engine: str) -> str:
+    """Equivalente async de scraper.fetchers._capture."""
+    if extractor is None or not IN_PAGE_EXTRACT:
+        return await page.content()
+    snap = extractor.snapshot(await page.evaluate(ANCHORS_JS, extractor.page_config()))
+    if antibot.classify(snap):
+        return snap
+    if extractor.needs_fallback(snap):
+        snap.fallback = await page.evaluate(FALLBACK_JS, extractor.fallback_config())
+        if extractor(snap) is None:
+            snapshots.save(series_name, page.url, engine, "nomatch", await page.content())
+    return snap
+
+async def fetch_html_async(pool: AsyncBrowserPool, url: str, wait_selector: Optional[str] = None,
+                           timeout_ms: Optional[int] = None, series_name: Optional[str] = None,
+                           extractor: Optional[ChapterExtractor] = None) -> Tuple[str, str, Optional[str]]:
+    """Equivalente async de fetch_html; ver scraper.fetchers.fetch_html."""
+    reasons = []
+    html = title = ""
+
+    for engine in engines.engine_order(url):
+        if reasons and budget.expired():
+            reasons.append("budget")
+            break
+        await asyncio.sleep(ratelimit.reserve(url))
+        try:
+            html, title, verdict = await _try_fetch_async(pool, engine, url, wait_selector,
+                                                          timeout_ms or budget.timeout_ms(url), extractor, series_name)
+            if not verdict.blocked:
+                engines.record(url, engine, True)
+                ratelimit.reward(url)
+                trace.annotate(engine=engine, html_len=getattr(html, "html_len", len(html)))
+                snapshots.save(series_name, url, engine, "ok", html)
+                return html, title, None
+            engines.record(url, engine, False)
+            ratelimit.penalize(url)
+            reasons.append(f"{engine}/antibot:{verdict.reason}")
+            snapshots.save(series_name, url, engine, "antibot", html)
+        except Exception as e:
+            engines.record(url, engine, False)
+            if type(e).__name__ == "TimeoutError":
+                ratelimit.penalize(url)
+            reasons.append(f"{engine}/{type(e).__name__}")
+
+    return html, title, "; ".join(reasons) or "blocked"
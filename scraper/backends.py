@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Selección de backend de descarga (FETCH_BACKEND):
+  - playwright: siempre navegador headless (comportamiento original)
+  - http:       solo requests; sin navegador
+  - auto:       primero HTTP; sube a Playwright solo si hay anti-bot o el parser no encuentra capítulo
+
+En modo auto se recuerda por host qué nivel funcionó (state/tiers.json) para que las
+siguientes corridas vayan directo a él. Un host marcado como "playwright" se vuelve a
+probar por HTTP pasados TIER_TTL_DAYS días.
+"""
+import os
+import time
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from . import fingerprint, store, trace
+from .utils import state_path, load_json, save_json
+from .fetchers import IN_PAGE_EXTRACT, fetch_html
+from .http_fetch import fetch_html_http
+from .parsepool import ParseStage, Pending
+from .sites.engine import ChapterExtractor, PageSnapshot
+
+FETCH_BACKEND = os.getenv("FETCH_BACKEND", "playwright").lower()
+TIER_TTL_S = float(os.getenv("TIER_TTL_DAYS", "7")) * 86400
+TIERS_FILE = state_path("tiers.json")
+
+Chapter = Union[Optional[str], Pending]
+FetchResult = Tuple[str, str, Optional[str], Chapter]  # (html, title, antibot_reason, chapter)
+
+_tiers: Optional[Dict[str, Dict]] = None
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+def _memory() -> Dict[str, Dict]:
+    global _tiers
+    if _tiers is None:
+        _tiers = load_json(TIERS_FILE)
+    return _tiers
+
+def preferred_tier(url: str) -> str:
+    """'http' o 'playwright' según lo que funcionó antes para este host."""
+    rec = _memory().get(_host(url))
+    if not rec:
+        return "http"
+    if rec.get("tier") == "playwright" and time.time() - rec.get("ts", 0) > TIER_TTL_S:
+        return "http"
+    return rec.get("tier", "http")
+
+def record_tier(url: str, tier: str) -> None:
+    mem = _memory()
+    host = _host(url)
+    prev = mem.get(host) or {}
+    # Conservamos el ts original mientras el nivel no cambie: así el TTL cuenta desde que se decidió
+    ts = prev.get("ts", time.time()) if prev.get("tier") == tier else time.time()
+    mem[host] = {"tier": tier, "ts": ts}
+
+def save_tiers() -> Dict[str, str]:
+    if _tiers is None:
+        return {}
+    save_json(TIERS_FILE, _tiers)
+    return {h: r["tier"] for h, r in sorted(_tiers.items())}
+
+def parses_raw_html() -> bool:
+    """
+    Si con esta config algún nivel le da HTML crudo a _parse, lo único que va a la etapa de
+    parse (scraper.parsepool). Con IN_PAGE_EXTRACT=1 Playwright devuelve PageSnapshot (ya
+    escaneado en el navegador) y el nivel HTTP de auto parsea en el hilo, porque de su
+    resultado depende subir a Playwright: queda FETCH_BACKEND=http o IN_PAGE_EXTRACT=0.
+    """
+    return FETCH_BACKEND == "http" or not IN_PAGE_EXTRACT
+
+def _parse(url: str, parser: ChapterExtractor, html: str, antibot_reason: Optional[str],
+           stage: Optional[ParseStage] = None, series_idx: Optional[int] = None) -> Chapter:
+    """
+    Parsea, salvo que la huella de la lista de capítulos sea la de la última revisión.
+    La huella solo se recuerda si el capítulo salió de los anchors (ver scraper.fingerprint).
+    Con `stage` el HTML crudo se parsea en un worker y se devuelve un Pending.
+    """
+    if antibot_reason:
+        return None
+    key = (series_idx, url)
+    fp = fingerprint.of(html, parser)
+    cur = store.chapter_for_fingerprint(url, fp) if fp else None
+    if cur is not None:
+        fingerprint.remember(key, fp, True)
+        with trace.span("parse", parser=parser.name) as sp:
+            sp["chapter"] = cur
+            sp["fingerprint_hit"] = True
+        return cur
+    if stage is not None and not isinstance(html, PageSnapshot):
+        pending = stage.submit(parser, html)
+
+        def remember(chapter: Optional[str]) -> Optional[str]:
+            fingerprint.remember(key, fp if pending.anchored else None, False)
+            return chapter
+        return pending.then(remember)
+    with trace.span("parse", parser=parser.name) as sp:
+        cur, anchored = parser.parse(html)
+        fingerprint.remember(key, fp if anchored else None, False)
+        sp["chapter"] = cur
+        sp["fingerprint_hit"] = False
+    return cur
+
+def _learn_tier(url: str, tier: str, cur: Chapter) -> None:
+    def learn(chapter: Optional[str]) -> Optional[str]:
+        if chapter is not None:
+            record_tier(url, tier)
+        return chapter
+
+    if isinstance(cur, Pending):
+        cur.then(learn)
+    else:
+        learn(cur)
+
+def fetch_and_parse(url: str, parser: ChapterExtractor, wait_selector: Optional[str] = None,
+                    timeout_ms: Optional[int] = None, series_name: Optional[str] = None,
+                    stage: Optional[ParseStage] = None, series_idx: Optional[int] = None) -> FetchResult:
+    """
+    Con `stage` (scraper.parsepool) el capítulo puede volver como Pending: el parse del
+    último nivel sigue en un worker. El nivel HTTP de auto parsea acá, porque de su
+    resultado depende subir a Playwright. La huella queda en scraper.fingerprint bajo
+    (series_idx, url).
+    """
+    if FETCH_BACKEND in ("http", "auto") and (FETCH_BACKEND == "http" or preferred_tier(url) == "http"):
+        html, title, reason = fetch_html_http(url, timeout_ms=timeout_ms, series_name=series_name)
+        if FETCH_BACKEND == "http":
+            return html, title, reason, _parse(url, parser, html, reason, stage, series_idx)
+        cur = _parse(url, parser, html, reason, series_idx=series_idx)
+        if cur is not None:
+            record_tier(url, "http")
+            return html, title, reason, cur
+
+    html, title, reason = fetch_html(url, wait_selector=wait_selector, timeout_ms=timeout_ms,
+                                     series_name=series_name, extractor=parser)
+    cur = _parse(url, parser, html, reason, stage, series_idx)
+    if FETCH_BACKEND == "auto":
+        _learn_tier(url, "playwright", cur)
+    return html, title, reason, cur
+
+async def fetch_and_parse_async(pool, url: str, parser: ChapterExtractor,
+                                wait_selector: Optional[str] = None, timeout_ms: Optional[int] = None,
+                                series_name: Optional[str] = None, series_idx: Optional[int] = None) -> FetchResult:
+    import asyncio
+    from .async_fetchers import fetch_html_async
+
+    if FETCH_BACKEND in ("http", "auto") and (FETCH_BACKEND == "http" or preferred_tier(url) == "http"):
+        html, title, reason = await asyncio.to_thread(fetch_html_http, url, timeout_ms, series_name)
+        cur = _parse(url, parser, html, reason, series_idx=series_idx)
+        if FETCH_BACKEND == "http":
+            return html, title, reason, cur
+        if cur is not None:
+            record_tier(url, "http")
+            return html, title, reason, cur
+
+    html, title, reason = await fetch_html_async(pool, url, wait_selector=wait_selector, timeout_ms=timeout_ms,
+                                                 series_name=series_name, extractor=parser)
+    cur = _parse(url, parser, html, reason, series_idx=series_idx)
+    if FETCH_BACKEND == "auto" and cur is not None:
+        record_tier(url, "playwright")
+    return html, title, reason, cur
+
+def fetch_raw(url: str, wait_selector: Optional[str] = None, timeout_ms: Optional[int] = None,
+              series_name: Optional[str] = None) -> Tuple[str, str, Optional[str]]:
+    """Descarga sin parser de serie (feeds): mismo criterio de nivel que fetch_and_parse, sin aprenderlo."""
+    if FETCH_BACKEND in ("http", "auto") and (FETCH_BACKEND == "http" or preferred_tier(url) == "http"):
+        html, title, reason = fetch_html_http(url, timeout_ms=timeout_ms, series_name=series_name)
+        if FETCH_BACKEND == "http" or not reason:
+            return html, title, reason
+    return fetch_html(url, wait_selector=wait_selector, timeout_ms=timeout_ms, series_name=series_name)
+
+async def fetch_raw_async(pool, url: str, wait_selector: Optional[str] = None, timeout_ms: Optional[int] = None,
+                          series_name: Optional[str] = None) -> Tuple[str, str, Optional[str]]:
+    import asyncio
+    from .async_fetchers import fetch_html_async
+
+    if FETCH_BACKEND in ("http", "auto") and (FETCH_BACKEND == "http" or preferred_tier(url) == "http"):
+        html, title, reason = await asyncio.to_thread(fetch_html_http, url, timeout_ms, series_name)
+        if FETCH_BACKEND == "http" or not reason:
+            return html, title, reason
+    return await fetch_html_async(pool, url, wait_selector=wait_selector, timeout_ms=timeout_ms,
+                                  series_name=series_name)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de navegadores Playwright que vive lo que dura la corrida.
+
+- Arranca el runtime de Playwright una sola vez (perezoso).
+- Lanza cada motor (chromium/firefox/webkit) solo cuando se pide por primera vez.
+- Entrega un context nuevo por serie y lo cierra al terminar.
+- Recicla el navegador tras BROWSER_MAX_USES contexts o si se cayó.
+"""
+import os
+from contextlib import contextmanager
+from typing import Dict, Optional, Iterator
+
+from . import trace
+
+MAX_USES = int(os.getenv("BROWSER_MAX_USES", "25"))
+LAUNCH_ARGS = ["--no-sandbox"]
+
+class BrowserPool:
+    def __init__(self, max_uses: int = MAX_USES):
+        self.max_uses = max(1, max_uses)
+        self._pw_cm = None
+        self._pw = None
+        self._browsers: Dict[str, object] = {}
+        self._uses: Dict[str, int] = {}
+        self.launches: Dict[str, int] = {}
+
+    def _runtime(self):
+        if self._pw is None:
+            # Playwright se importa recién aquí: las corridas solo HTTP y el CLI no lo cargan
+            from playwright.sync_api import sync_playwright
+
+            self._pw_cm = sync_playwright()
+            self._pw = self._pw_cm.start()
+        return self._pw
+
+    def _drop(self, engine: str) -> None:
+        browser = self._browsers.pop(engine, None)
+        self._uses.pop(engine, None)
+        try:
+            if browser:
+                browser.close()
+        except Exception:
+            pass
+
+    def browser(self, engine: str):
+        """Devuelve el navegador vivo de `engine`, lanzándolo o reciclándolo si hace falta."""
+        browser = self._browsers.get(engine)
+        if browser is not None:
+            alive = False
+            try:
+                alive = browser.is_connected()
+            except Exception:
+                pass
+            if not alive or self._uses.get(engine, 0) >= self.max_uses:
+                self._drop(engine)
+                browser = None
+
+        if browser is None:
+            with trace.span("launch", engine=engine):
+                launcher = getattr(self._runtime(), engine)
+                browser = launcher.launch(headless=True, args=LAUNCH_ARGS)
+            self._browsers[engine] = browser
+            self._uses[engine] = 0
+            self.launches[engine] = self.launches.get(engine, 0) + 1
+        return browser
+
+    @contextmanager
+    def context(self, engine: str, **options) -> Iterator[object]:
+        """Context nuevo y aislado por serie; se cierra siempre al salir."""
+        browser = self.browser(engine)
+        self._uses[engine] = self._uses.get(engine, 0) + 1
+        context = None
+        try:
+            context = browser.new_context(**options)
+            yield context
+        finally:
+            try:
+                if context:
+                    context.close()
+            except Exception:
+                pass
+            try:
+                crashed = not browser.is_connected()
+            except Exception:
+                crashed = True
+            if crashed and self._browsers.get(engine) is browser:
+                self._drop(engine)
+
+    def close(self) -> None:
+        for engine in list(self._browsers):
+            self._drop(engine)
+        if self._pw_cm is not None:
+            try:
+                self._pw_cm.__exit__(None, None, None)
+            except Exception:
+                pass
+        self._pw_cm = self._pw = None
+
+_POOL: Optional[BrowserPool] = None
+
+def get_pool() -> BrowserPool:
+    global _POOL
+    if _POOL is None:
+        _POOL = BrowserPool()
+    return _POOL
+
+def shutdown_pool() -> Dict[str, int]:
+    """Cierra navegadores y runtime. Devuelve cuántas veces se lanzó cada motor."""
+    global _POOL
+    if _POOL is None:
+        return {}
+    launches = dict(_POOL.launches)
+    _POOL.close()
+    _POOL = None
+    return launches
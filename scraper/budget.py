@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Presupuesto de tiempo de la corrida y timeouts adaptativos por host.
+
+- RUN_BUDGET_MIN (default 30; 0 = sin límite): pasado ese tiempo desde start() no se
+  empieza ninguna serie más; las que quedan salen con estado "cut" y siguen pendientes
+  para la próxima corrida. Los fetch en curso usan como máximo lo que queda.
+- Timeout por host y etapa (goto del navegador, http_get): p95 de las navegaciones que
+  terminaron bien (últimas corridas + esta) por TIMEOUT_FACTOR, entre TIMEOUT_MIN_MS y
+  TIMEOUT_MAX_MS. Con menos de TIMEOUT_MIN_SAMPLES muestras se usa TIMEOUT_MAX_MS.
+- order(): las series lentas (media de BUDGET_LATE_MS o más) o que fallan hace
+  BUDGET_LATE_FAILS revisiones seguidas van al final de la cola, así el corte les toca a ellas.
+
+Lo aprendido queda en state/latency.json.
+"""
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from . import trace
+from .config import Series
+from .utils import state_path, load_json, save_json
+
+RUN_BUDGET_S = float(os.getenv("RUN_BUDGET_MIN", "30")) * 60
+TIMEOUT_MIN_MS = int(os.getenv("TIMEOUT_MIN_MS", "8000"))
+TIMEOUT_MAX_MS = int(os.getenv("TIMEOUT_MAX_MS", "30000"))
+TIMEOUT_FACTOR = float(os.getenv("TIMEOUT_FACTOR", "2.5"))
+TIMEOUT_MIN_SAMPLES = int(os.getenv("TIMEOUT_MIN_SAMPLES", "5"))
+LATE_MS = float(os.getenv("BUDGET_LATE_MS", "20000"))
+LATE_FAILS = int(os.getenv("BUDGET_LATE_FAILS", "2"))
+LATENCY_FILE = state_path("latency.json")
+
+# Etapas cuyo timeout se adapta (las demás esperas de la página usan el mismo valor que goto)
+STAGES = ("goto", "http_get")
+KEEP_SAMPLES = 50
+# Nunca menos que esto, aunque al presupuesto le quede menos: un fetch cortado no sirve
+FLOOR_MS = 1000
+FAILED = ("info", "error")
+
+_lock = threading.Lock()
+_deadline: Optional[float] = None
+_learned: Optional[Dict[str, Dict]] = None
+
+def _state() -> Dict[str, Dict]:
+    global _learned
+    if _learned is None:
+        data = load_json(LATENCY_FILE)
+        _learned = {"hosts": data.get("hosts") or {}, "series": data.get("series") or {}}
+    return _learned
+
+def _pct(values: List[float], p: float) -> float:
+    s = sorted(values)
+    return s[max(0, min(len(s) - 1, math.ceil(p / 100.0 * len(s)) - 1))]
+
+def start(now: Optional[float] = None) -> None:
+    global _deadline
+    now = time.monotonic() if now is None else now
+    _deadline = now + RUN_BUDGET_S if RUN_BUDGET_S > 0 else None
+
+def remaining() -> Optional[float]:
+    """Segundos que le quedan a la corrida (None si no hay límite)."""
+    if _deadline is None:
+        return None
+    return max(0.0, _deadline - time.monotonic())
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+def _adaptive(samples: List[float]) -> int:
+    if len(samples) < TIMEOUT_MIN_SAMPLES:
+        return TIMEOUT_MAX_MS
+    return min(TIMEOUT_MAX_MS, max(TIMEOUT_MIN_MS, int(_pct(samples, 95) * TIMEOUT_FACTOR)))
+
+def timeout_ms(url: str, stage: str = "goto") -> int:
+    """Timeout de la etapa para el host de la URL, recortado a lo que le queda a la corrida."""
+    host = urlparse(url).netloc.lower()
+    ms = _adaptive((_state()["hosts"].get(host) or {}).get(stage, []) + trace.samples(stage).get(host, []))
+    left = remaining()
+    if left is not None:
+        ms = max(FLOOR_MS, min(ms, int(left * 1000)))
+    return ms
+
+def observe(url: str, ms: Optional[float], status: str) -> None:
+    """Anota cuánto tardó una serie y si falló (ms=None: terminó en excepción)."""
+    with _lock:
+        rec = _state()["series"].setdefault(url, {"ms": None, "fails": 0})
+        if ms is not None:
+            rec["ms"] = round(ms if rec["ms"] is None else 0.7 * rec["ms"] + 0.3 * ms, 1)
+        rec["fails"] = rec["fails"] + 1 if status in FAILED else 0
+
+def is_late(url: str) -> bool:
+    rec = _state()["series"].get(url)
+    if not rec:
+        return False
+    return rec.get("fails", 0) >= LATE_FAILS or (rec.get("ms") or 0) >= LATE_MS
+
+def order(series: List[Series]) -> List[Series]:
+    """Cola de la corrida: primero las series normales en su orden; al final las lentas o que fallan."""
+    late = [s for s in series if is_late(s.url)]
+    if not late:
+        return list(series)
+    recs = _state()["series"]
+    late.sort(key=lambda s: (recs[s.url].get("fails", 0), recs[s.url].get("ms") or 0))
+    late_ids = {s.idx for s in late}
+    return [s for s in series if s.idx not in late_ids] + late
+
+def save(urls: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Suma las navegaciones de esta corrida a lo aprendido y lo guarda. Si se pasa `urls`,
+    se descartan las series que ya no están en la watchlist. Devuelve {host: {etapa: timeout}}.
+    """
+    st = _state()
+    for stage in STAGES:
+        for host, values in trace.samples(stage).items():
+            per = st["hosts"].setdefault(host, {})
+            per[stage] = (per.get(stage, []) + [round(v, 1) for v in values])[-KEEP_SAMPLES:]
+    if urls is not None:
+        keep = set(urls)
+        st["series"] = {u: r for u, r in st["series"].items() if u in keep}
+    save_json(LATENCY_FILE, st)
+    return {h: {stage: _adaptive(v) for stage, v in per.items()} for h, per in sorted(st["hosts"].items())}
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Capa de config: series.yaml -> lista de Series.
+
+Cada entrada se normaliza una sola vez al cargar (nombre y URL sin espacios, host) y
+vive en un objeto con __slots__ que guarda solo eso: la URL normalizada y la clave de
+capítulo (norm_url, chapter_key) se calculan al pedirlas, porque solo las usan los
+dedupe y la búsqueda por URL, y el host se interna (son pocos y se repiten). Así una
+Series ocupa menos que el dict de la entrada (ver bench/bench_config.py).
+Las claves que no conocemos se conservan en `extra` y se vuelven a escribir al guardar.
+"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+from .utils import load_yaml, save_yaml, comparable_tuple
+
+SERIES_FILE = "series.yaml"
+
+def _split(u: str) -> Tuple[str, str]:
+    """(URL normalizada, host) con un solo urlparse."""
+    if not u:
+        return u, ""
+    p = urlparse(u)
+    netloc = (p.netloc or "").lower()
+    path = p.path or ""
+    if path.endswith("/") and len(path) > 1:
+        path = path[:-1]
+    norm = urlunparse(p._replace(scheme=(p.scheme or "").lower(), netloc=netloc, path=path))
+    return norm, netloc[4:] if netloc.startswith("www.") else netloc
+
+def normalize_url(u: str) -> str:
+    """Esquema/host en minúsculas y sin slash final (salvo raíz)."""
+    return _split((u or "").strip())[0]
+
+def host_of(url: str) -> str:
+    """Host en minúsculas y sin www."""
+    return _split((url or "").strip())[1]
+
+class Series:
+    __slots__ = ("idx", "name", "url", "host", "chapter", "extra")
+
+    def __init__(self, name: str, url: str, chapter: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None, idx: int = 0):
+        self.idx = idx
+        self.name = (name or "").strip()
+        self.url = (url or "").strip()
+        self.host = sys.intern(_split(self.url)[1])
+        self.extra = extra or None
+        self.set_chapter(chapter)
+
+    @property
+    def norm_url(self) -> str:
+        return _split(self.url)[0]
+
+    @property
+    def chapter_key(self) -> Tuple[int, int]:
+        return comparable_tuple(self.chapter)
+
+    def set_chapter(self, chapter: Optional[str]) -> None:
+        self.chapter = (str(chapter).strip() or None) if chapter is not None else None
+
+    @classmethod
+    def from_entry(cls, entry: Dict[str, Any], idx: int = 0) -> "Series":
+        extra = {k: v for k, v in entry.items() if k not in ("name", "url", "chapter")}
+        return cls(str(entry.get("name") or ""), str(entry.get("url") or ""), entry.get("chapter"), extra, idx)
+
+    def to_entry(self) -> Dict[str, Any]:
+        # El capítulo vive en el store (scraper.store), no en series.yaml
+        return {"name": self.name, "url": self.url, **(self.extra or {})}
+
+    def __repr__(self) -> str:
+        return f"Series({self.name!r}, {self.url!r})"
+
+def load_series(path: str = SERIES_FILE) -> List[Series]:
+    data = load_yaml(path)
+    return [Series.from_entry(e, i) for i, e in enumerate(data.get("series") or []) if isinstance(e, dict)]
+
+def save_series(path: str, series: Iterable[Series]) -> None:
+    save_yaml(path, {"series": [s.to_entry() for s in series]})
+
+def with_chapters(series: List[Series]) -> List[Series]:
+    """Completa `chapter` con lo que tiene el store, en una sola consulta."""
+    from . import store
+
+    chapters = store.all_chapters()
+    for s in series:
+        ch = chapters.get(s.url)
+        if ch is not None:
+            s.set_chapter(ch)
+    return series
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Piezas del modo daemon (main.py --daemon): un proceso que queda vivo y revisa cada
+DAEMON_INTERVAL_MIN minutos, con los navegadores calientes entre ciclos.
+
+- WarmRuntime: el pool de navegadores (sync o async) sobrevive a cada ciclo, igual
+  que los workers de parse (scraper.parsepool).
+- FileWatch: detecta cambios en series.yaml por mtime/tamaño; el daemon los recarga
+  y adelanta el siguiente ciclo.
+- Status + serve(): GET /healthz y GET /status (JSON) en DAEMON_HOST:DAEMON_PORT
+  (default 127.0.0.1:8765). /healthz responde 503 si el último ciclo terminado es más
+  viejo que DAEMON_STALE_FACTOR intervalos o si el último ciclo falló.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .utils import yprint
+
+if TYPE_CHECKING:
+    import asyncio
+
+DAEMON_INTERVAL_S = float(os.getenv("DAEMON_INTERVAL_MIN", "10")) * 60
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8765"))
+STALE_FACTOR = float(os.getenv("DAEMON_STALE_FACTOR", "3"))
+WATCH_POLL_S = 2.0
+# Últimos resultados por serie que muestra /status
+RECENT = 500
+
+class WarmRuntime:
+    """Navegadores que viven entre ciclos. En modo async también el event loop."""
+    def __init__(self):
+        self._loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._pool = None
+
+    def run_async(self, fn):
+        """Corre fn(pool) en el loop del daemon con el pool async compartido."""
+        import asyncio
+        from .async_fetchers import AsyncBrowserPool
+
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        if self._pool is None:
+            self._pool = AsyncBrowserPool()
+        try:
+            return self._loop.run_until_complete(fn(self._pool))
+        finally:
+            self._loop.run_until_complete(self._pool.prune())
+
+    def close(self) -> Dict[str, int]:
+        from .browser_pool import shutdown_pool
+        from .parsepool import shutdown as shutdown_parsers
+
+        shutdown_parsers()
+        launches = shutdown_pool()
+        if self._loop is not None:
+            if self._pool is not None:
+                for engine, n in self._loop.run_until_complete(self._pool.close()).items():
+                    launches[engine] = launches.get(engine, 0) + n
+            self._loop.close()
+        self._loop = self._pool = None
+        return launches
+
+class FileWatch:
+    def __init__(self, path: str):
+        self.path = path
+        self._sig = self._stat()
+
+    def _stat(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime, st.st_size
+        except OSError:
+            return None
+
+    def changed(self) -> bool:
+        """True una vez por cada cambio del archivo."""
+        sig = self._stat()
+        if sig == self._sig:
+            return False
+        self._sig = sig
+        return True
+
+def wait(stop: threading.Event, seconds: float, watch: FileWatch) -> str:
+    """Duerme hasta el próximo ciclo. Devuelve "stop", "changed" o "timer"."""
+    end = time.monotonic() + seconds
+    while True:
+        left = end - time.monotonic()
+        if left <= 0:
+            return "timer"
+        if stop.wait(min(WATCH_POLL_S, left)):
+            return "stop"
+        if watch.changed():
+            return "changed"
+
+class Status:
+    def __init__(self, interval_s: float = DAEMON_INTERVAL_S):
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.cycles = 0
+        self.running = False
+        self.series = 0
+        self.reloaded: Optional[float] = None
+        self.last: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self.next_at: Optional[float] = None
+        self.recent: Dict[str, Dict[str, Any]] = {}
+        self._t0 = 0.0
+
+    def begin(self, n_series: int) -> None:
+        with self._lock:
+            self.running = True
+            self.series = n_series
+            self.next_at = None
+            self._t0 = time.time()
+
+    def end(self, results: List[Dict[str, Any]], changed: bool) -> None:
+        counts: Dict[str, int] = {}
+        for r in results:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        with self._lock:
+            now = time.time()
+            self.running = False
+            self.cycles += 1
+            self.last_error = None
+            self.last = {"started": self._t0, "finished": now, "seconds": round(now - self._t0, 1),
+                         "counts": counts, "changed": changed}
+            for r in results:
+                if r["status"] != "skip":
+                    self.recent[r["url"]] = {k: r.get(k) for k in ("name", "status", "cur", "ts", "error")}
+            if len(self.recent) > RECENT:
+                for url in sorted(self.recent, key=lambda u: self.recent[u]["ts"] or 0)[:len(self.recent) - RECENT]:
+                    del self.recent[url]
+
+    def fail(self, exc: BaseException) -> None:
+        with self._lock:
+            self.running = False
+            self.last_error = f"{type(exc).__name__}: {exc}"
+
+    def sleeping(self, seconds: float) -> None:
+        with self._lock:
+            self.next_at = time.time() + seconds
+
+    def healthy(self) -> Tuple[bool, str]:
+        with self._lock:
+            if self.last_error:
+                return False, f"último ciclo falló: {self.last_error}"
+            ref = self.last["finished"] if self.last else self.started
+            age = time.time() - ref
+            if age > STALE_FACTOR * self.interval_s + (0 if self.last else self.interval_s):
+                return False, f"sin ciclos terminados hace {age / 60:.0f} min"
+            return True, "ok"
+
+    def snapshot(self) -> Dict[str, Any]:
+        ok, why = self.healthy()
+        with self._lock:
+            return {"ok": ok, "reason": why, "pid": os.getpid(), "started": self.started,
+                    "uptime_s": round(time.time() - self.started), "interval_s": self.interval_s,
+                    "cycles": self.cycles, "running": self.running, "series": self.series,
+                    "reloaded": self.reloaded, "next_at": self.next_at, "last": self.last,
+                    "last_error": self.last_error, "recent": dict(self.recent)}
+
+def serve(status: Status, host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> ThreadingHTTPServer:
+    """Levanta el endpoint de salud en un hilo aparte; server.shutdown() lo detiene."""
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body, ensure_ascii=False, indent=1).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/healthz":
+                ok, why = status.healthy()
+                self._send(200 if ok else 503, {"ok": ok, "reason": why})
+            elif path == "/status":
+                self._send(200, status.snapshot())
+            else:
+                self._send(404, {"error": "rutas: /healthz, /status"})
+
+        def log_message(self, fmt, *args):
+            pass  # el log de la corrida ya es bastante
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="daemon-http", daemon=True).start()
+    yprint(f"[daemon] salud en http://{host}:{server.server_address[1]}/healthz (estado en /status)")
+    return server
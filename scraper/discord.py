@@ -1,53 +1,173 @@
 # -*- coding: utf-8 -*-
+"""
+Envío a un webhook de Discord.
+
+- Una sola Session (keep-alive) para todos los mensajes de la corrida.
+- Respeta los headers de rate limit por bucket (X-RateLimit-Remaining / Reset-After):
+  si el bucket se agotó, espera antes del siguiente envío en vez de chocar con un 429.
+- 429: espera lo que diga retry_after / Retry-After y reintenta. 5xx y errores de red:
+  reintenta con backoff exponencial. Otros 4xx: no tiene sentido reintentar.
+- Empaqueta por líneas: una línea de serie nunca queda partida entre dos mensajes.
+  DISCORD_FORMAT=embed manda las líneas en embeds (hasta ~6000 chars por mensaje en vez de 2000).
+"""
 import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
 import requests
-from typing import Optional, Dict, Any, Iterable
+from requests.adapters import HTTPAdapter
 
 DISCORD_DEBUG = os.getenv("DISCORD_DEBUG", "0") == "1"
+DISCORD_FORMAT = os.getenv("DISCORD_FORMAT", "text").lower()
+MAX_RETRIES = int(os.getenv("DISCORD_RETRIES", "4"))
+
+TEXT_LIMIT = 1900          # content: máx 2000
+EMBED_DESC_LIMIT = 4000    # description: máx 4096
+EMBEDS_PER_MESSAGE = 10
+MESSAGE_EMBED_TOTAL = 5800  # suma de textos de embeds por mensaje: máx 6000
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# bucket -> (restantes, momento en que se repone); webhook -> bucket
+_buckets: Dict[str, List[float]] = {}
+_bucket_of: Dict[str, str] = {}
+
+def _log(msg: str) -> None:
+    if DISCORD_DEBUG:
+        print(f"[discord] {msg}", flush=True)
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            s.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+            s.headers.update({"Content-Type": "application/json"})
+            _session = s
+        return _session
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def pack_lines(lines: Iterable[str], limit: int = TEXT_LIMIT) -> List[str]:
+    """Junta líneas en bloques de hasta `limit` chars sin partirlas (salvo una línea que sola no cabe)."""
+    out: List[str] = []
+    buf = ""
+    for line in lines:
+        while len(line) > limit:
+            if buf:
+                out.append(buf)
+                buf = ""
+            out.append(line[:limit])
+            line = line[limit:]
+        if buf and len(buf) + 1 + len(line) > limit:
+            out.append(buf)
+            buf = ""
+        buf = f"{buf}\n{line}" if buf else line
+    if buf:
+        out.append(buf)
+    return out
+
+def _payloads(content: str, username: Optional[str], avatar_url: Optional[str]) -> List[Dict[str, Any]]:
+    base: Dict[str, Any] = {"allowed_mentions": {"parse": []}}  # evita @everyone etc.
+    if username:
+        base["username"] = username
+    if avatar_url:
+        base["avatar_url"] = avatar_url
+
+    lines = (content or "").split("\n")
+    if DISCORD_FORMAT != "embed":
+        return [{**base, "content": part} for part in pack_lines(lines, TEXT_LIMIT)]
+
+    payloads: List[Dict[str, Any]] = []
+    embeds: List[Dict[str, str]] = []
+    total = 0
+    for desc in pack_lines(lines, EMBED_DESC_LIMIT):
+        if embeds and (len(embeds) == EMBEDS_PER_MESSAGE or total + len(desc) > MESSAGE_EMBED_TOTAL):
+            payloads.append({**base, "embeds": embeds})
+            embeds, total = [], 0
+        embeds.append({"description": desc})
+        total += len(desc)
+    if embeds:
+        payloads.append({**base, "embeds": embeds})
+    return payloads
 
-def _chunks(text: str, limit: int = 1900) -> Iterable[str]:
-    text = text or ""
-    while text:
-        yield text[:limit]
-        text = text[limit:]
+def _wait_for_bucket(webhook_url: str) -> None:
+    state = _buckets.get(_bucket_of.get(webhook_url, ""))
+    if state and state[0] <= 0:
+        delay = state[1] - time.monotonic()
+        if delay > 0:
+            _log(f"bucket agotado, espero {delay:.2f}s")
+            time.sleep(delay)
+
+def _remember_bucket(webhook_url: str, resp: requests.Response) -> None:
+    h = resp.headers
+    bucket = h.get("X-RateLimit-Bucket") or webhook_url
+    _bucket_of[webhook_url] = bucket
+    try:
+        remaining = float(h["X-RateLimit-Remaining"])
+        reset_after = float(h["X-RateLimit-Reset-After"])
+    except (KeyError, ValueError):
+        return
+    _buckets[bucket] = [remaining, time.monotonic() + reset_after]
+
+def _retry_after(resp: requests.Response) -> float:
+    try:
+        return float(resp.json().get("retry_after"))
+    except (ValueError, TypeError, AttributeError):
+        pass
+    try:
+        return float(resp.headers.get("Retry-After", "1"))
+    except ValueError:
+        return 1.0
+
+def _post(webhook_url: str, payload: Dict[str, Any]) -> bool:
+    session = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        _wait_for_bucket(webhook_url)
+        try:
+            resp = session.post(webhook_url, json=payload, timeout=20)
+        except requests.RequestException as e:
+            _log(f"error de red: {type(e).__name__}: {e}")
+            if attempt < MAX_RETRIES:
+                time.sleep(2 ** attempt)
+            continue
+
+        _remember_bucket(webhook_url, resp)
+        if resp.status_code in (200, 204):
+            return True
+        if resp.status_code == 429:
+            delay = _retry_after(resp)
+            _log(f"429 (global={resp.headers.get('X-RateLimit-Global', 'false')}), reintento en {delay:.2f}s")
+            if attempt < MAX_RETRIES:
+                time.sleep(delay)
+            continue
+        _log(f"status={resp.status_code} body={resp.text[:400]}")
+        if resp.status_code < 500:
+            return False
+        # Sin más intentos no tiene sentido esperar
+        if attempt < MAX_RETRIES:
+            time.sleep(2 ** attempt)
+    return False
 
 def send_discord_message(webhook_url: str, content: str,
                          username: Optional[str] = None,
                          avatar_url: Optional[str] = None) -> bool:
     """
-    Envía content fragmentado (Discord máx ~2000 chars). Devuelve True si TODOS los
-    envíos devolvieron 2xx/204. Con DISCORD_DEBUG=1 imprime estado y body si falla.
+    Envía content en tantos mensajes como haga falta, sin partir líneas. Devuelve True si
+    TODOS llegaron. Si uno falla tras los reintentos se corta, para no mandar el resumen
+    desordenado. Con DISCORD_DEBUG=1 imprime estado y body si falla.
     """
     if not webhook_url:
-        if DISCORD_DEBUG:
-            print("[discord] webhook vacío")
+        _log("webhook vacío")
         return False
 
-    ok = True
-    headers = {"Content-Type": "application/json"}
-
-    for part in _chunks(content, limit=1900):
-        payload: Dict[str, Any] = {
-            "content": part,
-            "allowed_mentions": {"parse": []},  # evita @everyone etc.
-        }
-        if username:
-            payload["username"] = username
-        if avatar_url:
-            payload["avatar_url"] = avatar_url
-
-        try:
-            resp = requests.post(webhook_url, json=payload, headers=headers, timeout=20)
-            if resp.status_code not in (200, 204):
-                ok = False
-                if DISCORD_DEBUG:
-                    print(f"[discord] status={resp.status_code} body={resp.text[:400]}")
-                # Si falla un chunk, paramos
-                break
-        except requests.RequestException as e:
-            ok = False
-            if DISCORD_DEBUG:
-                print(f"[discord] error de red: {type(e).__name__}: {e}")
-            break
-
-    return ok
+    for payload in _payloads(content, username, avatar_url):
+        if not _post(webhook_url, payload):
+            return False
+    return True
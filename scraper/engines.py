@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Historial de éxito/fallo por (host, motor) para decidir en qué orden probar los motores.
+
+Se guarda en state/engines.json. Los contadores decaen con vida media
+ENGINE_HALF_LIFE_DAYS, así un motor que falló hace tiempo vuelve a acercarse al
+orden por defecto y el orden puede revertirse si el sitio cambia.
+"""
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .utils import state_path, load_json, save_json
+
+DEFAULT_ORDER = ("chromium", "firefox", "webkit")
+HALF_LIFE_S = float(os.getenv("ENGINE_HALF_LIFE_DAYS", "7")) * 86400
+ENGINES_FILE = state_path("engines.json")
+
+_history: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None
+# Intentos/éxitos de esta corrida, solo para el resumen
+_run: Dict[Tuple[str, str], List[int]] = {}
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+def _memory() -> Dict[str, Dict[str, Dict[str, float]]]:
+    global _history
+    if _history is None:
+        _history = load_json(ENGINES_FILE)
+    return _history
+
+def _decayed(rec: Dict[str, float], now: float) -> Tuple[float, float]:
+    age = max(0.0, now - rec.get("ts", now))
+    k = 0.5 ** (age / HALF_LIFE_S) if HALF_LIFE_S > 0 else 1.0
+    return rec.get("ok", 0.0) * k, rec.get("fail", 0.0) * k
+
+def _score(rec: Optional[Dict[str, float]], now: float) -> float:
+    # Laplace: sin historia todos valen 0.5 y se respeta DEFAULT_ORDER
+    if not rec:
+        return 0.5
+    ok, fail = _decayed(rec, now)
+    return (ok + 1.0) / (ok + fail + 2.0)
+
+def engine_order(url: str) -> Tuple[str, ...]:
+    stats = _memory().get(_host(url)) or {}
+    now = time.time()
+    # sorted es estable: a igualdad de score se mantiene chromium → firefox → webkit
+    return tuple(sorted(DEFAULT_ORDER, key=lambda e: -_score(stats.get(e), now)))
+
+def record(url: str, engine: str, ok: bool) -> None:
+    host = _host(url)
+    now = time.time()
+    rec = _memory().setdefault(host, {}).get(engine) or {}
+    n_ok, n_fail = _decayed(rec, now)
+    _memory()[host][engine] = {
+        "ok": round(n_ok + (1.0 if ok else 0.0), 4),
+        "fail": round(n_fail + (0.0 if ok else 1.0), 4),
+        "ts": now,
+    }
+    counts = _run.setdefault((host, engine), [0, 0])
+    counts[0] += 1
+    counts[1] += 1 if ok else 0
+
+def reset_run() -> None:
+    """Vacía los contadores del resumen (cada ciclo del daemon es una corrida)."""
+    _run.clear()
+
+def save_engine_stats() -> None:
+    if _history is not None:
+        save_json(ENGINES_FILE, _history)
+
+def summary_lines() -> List[str]:
+    """Tasa de acierto por host y motor en esta corrida, en el orden preferido actual."""
+    lines = []
+    for host in sorted({h for h, _ in _run}):
+        parts = []
+        for engine in engine_order(f"https://{host}/"):
+            tried, hits = _run.get((host, engine), (0, 0))
+            if tried:
+                parts.append(f"{engine} {hits}/{tried} ({100 * hits // tried}%)")
+        lines.append(f"  {host}: " + ", ".join(parts))
+    return lines
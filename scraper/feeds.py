@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Modo feed: una descarga por host en vez de una por serie.
+
+Para los hosts con FeedAdapter (scraper.sites.get_feed_for_url) y al menos
+FEED_MIN_SERIES series que tocan en la corrida, se baja la página de últimas
+actualizaciones y se resuelven desde ahí las series que aparecen. Vuelven a su
+fetch normal las que el feed no trae y las dudosas:
+  - sin capítulo previo en el store (el init se hace con la página de la serie)
+  - slug compartido por varias URLs de la watchlist
+  - capítulo del feed menor que el guardado, o un salto que sane_chapter_for_update no acepta
+Si el feed falla (anti-bot, sin anchors) todas las series del host van por la vía normal.
+FEEDS=1 lo activa (default apagado).
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from . import store, trace
+from .config import Series
+from .sites import get_feed_for_url
+from .sites.feed import FeedAdapter
+from .utils import yprint, comparable_tuple, sane_chapter_for_update
+
+FEEDS_ENABLED = os.getenv("FEEDS", "0") == "1"
+FEED_MIN_SERIES = int(os.getenv("FEED_MIN_SERIES", "2"))
+
+def plan(series: List[Series]) -> Dict[str, Tuple[FeedAdapter, List[Series]]]:
+    """{host: (feed, series del host)} para los hosts donde conviene usar el feed."""
+    if not FEEDS_ENABLED:
+        return {}
+    groups: Dict[str, Tuple[FeedAdapter, List[Series]]] = {}
+    for s in series:
+        feed = get_feed_for_url(s.url)
+        if feed is not None:
+            groups.setdefault(s.host, (feed, []))[1].append(s)
+    return {h: g for h, g in groups.items() if len(g[1]) >= FEED_MIN_SERIES}
+
+def match(feed: FeedAdapter, html: str, series: List[Series]) -> Dict[int, str]:
+    """{idx: capítulo} de las series que el feed resuelve sin dudas."""
+    found = feed.parse(html)
+    by_slug: Dict[str, List[Series]] = {}
+    for s in series:
+        key = feed.series_key(s.url)
+        if key:
+            by_slug.setdefault(key, []).append(s)
+
+    out: Dict[int, str] = {}
+    for slug, group in by_slug.items():
+        if slug not in found or len({s.norm_url for s in group}) > 1:
+            continue
+        cur = found[slug][0]
+        for s in group:
+            prev = store.current_chapter(s.url)
+            if prev is None or comparable_tuple(cur) < comparable_tuple(prev):
+                continue
+            if not sane_chapter_for_update(prev, cur):
+                continue
+            out[s.idx] = cur
+    return out
+
+def _report(host: str, feed: FeedAdapter, series: List[Series], hits: Dict[int, str],
+            reason: Optional[str], rec: Dict) -> None:
+    rec["status"] = "feed"
+    rec["feed_hits"] = len(hits)
+    rec["feed_series"] = len(series)
+    if reason:
+        yprint(f"[feed] {host}: sin feed ({reason}); {len(series)} series por la vía normal")
+    else:
+        yprint(f"[feed] {host}: {len(hits)}/{len(series)} series resueltas con {feed.url}")
+
+def resolve(series: List[Series]) -> Dict[int, str]:
+    """Baja el feed de cada host elegible y devuelve {idx: capítulo} de las series resueltas."""
+    from .backends import fetch_raw
+
+    hits: Dict[int, str] = {}
+    for host, (feed, group) in plan(series).items():
+        with trace.series(f"feed:{host}", feed.url) as rec:
+            try:
+                html, _, reason = fetch_raw(feed.url, feed.wait_selector, series_name=f"feed:{host}")
+            except Exception as e:
+                html, reason = "", f"{type(e).__name__}: {e}"
+            found = {} if reason else match(feed, html, group)
+            _report(host, feed, group, found, reason, rec)
+        hits.update(found)
+    return hits
+
+async def resolve_async(series: List[Series], pool) -> Dict[int, str]:
+    """Equivalente async de resolve (los feeds de distintos hosts se bajan a la vez)."""
+    import asyncio
+    from .backends import fetch_raw_async
+
+    async def one(host: str, feed: FeedAdapter, group: List[Series]) -> Dict[int, str]:
+        with trace.series(f"feed:{host}", feed.url) as rec:
+            try:
+                html, _, reason = await fetch_raw_async(pool, feed.url, feed.wait_selector,
+                                                        series_name=f"feed:{host}")
+            except Exception as e:
+                html, reason = "", f"{type(e).__name__}: {e}"
+            found = {} if reason else match(feed, html, group)
+            _report(host, feed, group, found, reason, rec)
+        return found
+
+    hits: Dict[int, str] = {}
+    for found in await asyncio.gather(*(one(h, f, g) for h, (f, g) in plan(series).items())):
+        hits.update(found)
+    return hits
@@ -1,132 +1,226 @@
 # -*- coding: utf-8 -*-
-from typing import Optional, Tuple
-from playwright.sync_api import sync_playwright
+from typing import Dict, List, Optional, Tuple
 import time
 import os
-import re
-
-DUMPS_DIR = os.getenv("HTML_DUMPS_DIR", "last_html")
-os.makedirs(DUMPS_DIR, exist_ok=True)
-
-ANTI_BOT_PATTERNS = [
-    # Inglés
-    r"Just a moment",
-    r"Checking your browser before accessing",
-    r"Attention Required!\s*\|\s*Cloudflare",
-    r"cf-error-details",
-    r"cf-please-wait",
-    r"__cf_chl_captcha",
-    r"hcaptcha",
-    r"Please enable JavaScript and Cookies",
-    # Español (¡clave para tus logs!)
-    r"Un momento",
-    r"Comprobando tu navegador antes de acceder",
-    r"Atenci[oó]n requerida",
-    r"Por favor (habilita|activa) JavaScript y las Cookies",
-]
-
-def _looks_like_antibot(html: str) -> bool:
-    if not html:
-        return True
-    txt = html[:120000]
-    for pat in ANTI_BOT_PATTERNS:
-        if re.search(pat, txt, re.IGNORECASE):
-            return True
-    return False
-
-def _safe_close(context, browser):
-    try:
-        if context:
-            context.close()
-    except Exception:
-        pass
-    try:
-        if browser:
-            browser.close()
-    except Exception:
-        pass
-
-def _dump_html(kind: str, name: str, html: str) -> str:
-    slug = re.sub(r"[^a-z0-9\-_.]+", "_", name.lower())[:80]
-    path = os.path.join(DUMPS_DIR, f"{slug}.{kind}.html")
-    try:
-        with open(path, "w", encoding="utf-8") as fh:
-            fh.write(html or "")
-    except Exception:
-        pass
-    return path
-
-def _try_fetch(p, browser_name: str, url: str, wait_selector: Optional[str], timeout_ms: int) -> Tuple[str, str]:
-    ua_map = {
-        "chromium": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
-        "firefox":  "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
-        "webkit":   "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3 Safari/605.1.15",
-    }
-    browser = context = page = None
-    try:
-        engine = getattr(p, browser_name)
-        browser = engine.launch(headless=True, args=["--no-sandbox"])
-        context = browser.new_context(
-            user_agent=ua_map.get(browser_name, ua_map["chromium"]),
-            locale="es-MX",
-            timezone_id="America/Mexico_City",
-            viewport={"width": 1366, "height": 850},
-            java_script_enabled=True,
-        )
-        context.set_extra_http_headers({
-            "Accept-Language": "es-MX,es;q=0.9,en;q=0.8",
-            "Referer": "https://www.google.com/",
-        })
-        page = context.new_page()
 
-        # Primer modo
-        page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
-        if wait_selector:
+from .browser_pool import BrowserPool, get_pool
+from . import antibot, budget, engines, netfilter, ratelimit, sessions, snapshots, trace
+from .sites import get_allowed_resources_for_url, get_readiness_for_url
+from .sites.engine import ANCHORS_JS, FALLBACK_JS, ChapterExtractor
+from .sites.readiness import READY_JS, READY_POLL_MS, Readiness
+
+IN_PAGE_EXTRACT = os.getenv("IN_PAGE_EXTRACT", "1") == "1"
+
+UA_MAP = {
+    "chromium": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "firefox":  "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "webkit":   "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3 Safari/605.1.15",
+}
+
+EXTRA_HEADERS = {
+    "Accept-Language": "es-MX,es;q=0.9,en;q=0.8",
+    "Referer": "https://www.google.com/",
+}
+
+def context_options(browser_name: str) -> dict:
+    """Opciones de new_context compartidas por el modo sync y el async."""
+    return dict(
+        user_agent=UA_MAP.get(browser_name, UA_MAP["chromium"]),
+        locale="es-MX",
+        timezone_id="America/Mexico_City",
+        viewport={"width": 1366, "height": 850},
+        java_script_enabled=True,
+    )
+
+SCROLL_JS = "window.scrollTo(0, document.body.scrollHeight)"
+
+class ReadyStats:
+    """Cuánto se esperó a que la página estuviera lista y por qué se dejó de esperar."""
+    def __init__(self):
+        self.reasons: Dict[str, int] = {}
+        self.waits: List[float] = []
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def add(self, reason: str, ms: float) -> None:
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        self.waits.append(ms)
+
+    def summary(self) -> str:
+        s = sorted(self.waits)
+        detail = ", ".join(f"{k}={v}" for k, v in sorted(self.reasons.items()))
+        return (f"{len(s)} esperas ({detail}); p50={s[len(s) // 2]:.0f}ms "
+                f"max={s[-1]:.0f}ms total={sum(s) / 1000:.1f}s")
+
+READY = ReadyStats()
+
+def _ready_reason(e: Exception) -> str:
+    # Timeout: se llegó al tope; otro error (p. ej. el challenge navegó a otra página): no se sabe
+    return "max" if type(e).__name__ == "TimeoutError" else "error"
+
+def _settle(page, ready: Readiness, timeout_ms: int, engine: str) -> None:
+    """Scroll al final y espera a que la página esté lista según la estrategia del sitio."""
+    with trace.span("settle", engine=engine) as sp:
+        page.evaluate(SCROLL_JS)
+        try:
+            handle = page.wait_for_function(READY_JS, arg=ready.config(), polling=READY_POLL_MS,
+                                            timeout=min(ready.max_ms, timeout_ms))
+            sp["ready"] = handle.json_value()
+        except Exception as e:
+            sp["ready"] = _ready_reason(e)
+    READY.add(sp["ready"], sp["ms"])
+
+def _wait_ready(page, wait_selector: Optional[str], ready: Readiness, timeout_ms: int, engine: str) -> None:
+    if wait_selector:
+        with trace.span("wait_selector", engine=engine):
             try:
                 page.wait_for_selector(wait_selector, timeout=timeout_ms)
             except Exception:
                 pass
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(1.0)
-        html = page.content()
-        title = page.title()
-
-        # Segundo intento si parece anti-bot
-        if _looks_like_antibot(html):
-            page.goto(url, wait_until="networkidle", timeout=timeout_ms)
-            if wait_selector:
-                try:
-                    page.wait_for_selector(wait_selector, timeout=timeout_ms)
-                except Exception:
-                    pass
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(1.2)
-            html = page.content()
-            title = page.title()
-
-        return html, title
-    finally:
-        _safe_close(context, browser)
-
-def fetch_html(url: str, wait_selector: Optional[str] = None, timeout_ms: int = 30000,
-               series_name: Optional[str] = None) -> Tuple[str, str, Optional[str]]:
+    _settle(page, ready, timeout_ms, engine)
+
+# Errores de evaluate cuando el documento navegó mientras tanto (un challenge que redirige)
+NAVIGATED = ("Execution context was destroyed", "Cannot find context with specified id", "frame was detached")
+
+def _navigated(e: Exception) -> bool:
+    return any(s in str(e) for s in NAVIGATED)
+
+def _peek(page) -> Dict[str, Optional[str]]:
+    """Título e inicio del HTML (antibot.PEEK_JS); vacío si el documento está navegando."""
+    try:
+        return page.evaluate(antibot.PEEK_JS, antibot.WINDOW)
+    except Exception as e:
+        if not _navigated(e):
+            raise
+        return {"title": None, "html": None}
+
+def _goto(page, watch: antibot.ResponseWatch, url: str, wait_until: str, timeout_ms: int,
+          engine: str, stage: str, early: bool = True) -> Tuple[antibot.Verdict, Dict[str, Optional[str]]]:
     """
-    Devuelve (html, title, antibot_reason)
-    - Intenta Chromium, Firefox y WebKit
-    - Marca como antibot si detecta challenge; vuelca HTML en last_html/
+    Navega hasta que llegan los headers del documento y, si con ellos el challenge no es
+    seguro, hasta `wait_until`. Devuelve el veredicto temprano y lo que se vio del documento
+    (_peek): con certain no vale la pena esperar selector ni settle, ni capturar. Con
+    early=False siempre espera `wait_until` (el reintento, que está para darle tiempo al
+    challenge de resolverse).
     """
-    with sync_playwright() as p:
-        reasons = []
+    with trace.span(stage, engine=engine) as sp:
+        t0 = time.monotonic()
+        page.goto(url, wait_until="commit", timeout=timeout_ms)
+        verdict = watch.verdict()
+        if not (early and verdict.certain):
+            left = max(1, timeout_ms - int((time.monotonic() - t0) * 1000))
+            page.wait_for_load_state(wait_until, timeout=left)
+        peek = _peek(page)
+        verdict = watch.verdict(**peek)
+        if verdict.confidence:
+            sp["antibot"] = f"{verdict.confidence:.2f} {verdict.reason}"
+    return verdict, peek
+
+def _capture(page, extractor: Optional[ChapterExtractor], series_name: Optional[str], engine: str) -> str:
+    """
+    HTML completo (page.content()) o, si hay extractor e IN_PAGE_EXTRACT=1, un PageSnapshot
+    con los anchors extraídos en el navegador. El HTML completo solo se trae para el
+    snapshot de diagnóstico cuando el extractor no encuentra capítulo.
+    """
+    if extractor is None or not IN_PAGE_EXTRACT:
+        return page.content()
+    snap = extractor.snapshot(page.evaluate(ANCHORS_JS, extractor.page_config()))
+    if antibot.classify(snap):
+        return snap
+    if extractor.needs_fallback(snap):
+        snap.fallback = page.evaluate(FALLBACK_JS, extractor.fallback_config())
+        if extractor(snap) is None:
+            snapshots.save(series_name, page.url, engine, "nomatch", page.content())
+    return snap
+
+def _capture_page(page, extractor: Optional[ChapterExtractor], series_name: Optional[str],
+                  engine: str) -> Tuple[str, str]:
+    with trace.span("capture", engine=engine) as sp:
+        html = _capture(page, extractor, series_name, engine)
+        sp["bytes"] = getattr(html, "html_len", len(html))
+    return html, page.title()
 
-        for engine in ("chromium", "firefox", "webkit"):
+def _try_fetch(pool: BrowserPool, browser_name: str, url: str, wait_selector: Optional[str], timeout_ms: int,
+               extractor: Optional[ChapterExtractor] = None,
+               series_name: Optional[str] = None) -> Tuple[str, str, antibot.Verdict]:
+    stored = sessions.storage_state_for(url, browser_name)
+    ready = get_readiness_for_url(url)
+    with pool.context(browser_name, storage_state=stored, **context_options(browser_name)) as context:
+        context.set_extra_http_headers(EXTRA_HEADERS)
+        netfilter.install(context, get_allowed_resources_for_url(url))
+        page = context.new_page()
+        watch = antibot.ResponseWatch(page)
+
+        # Primer modo
+        verdict, peek = _goto(page, watch, url, "domcontentloaded", timeout_ms, browser_name, "goto")
+        if verdict.certain:
+            # Challenge seguro: no se captura el documento a medio cargar, queda lo que se vio
+            html, title = peek["html"] or "", peek["title"] or ""
+        else:
+            _wait_ready(page, wait_selector, ready, timeout_ms, browser_name)
             try:
-                html, title = _try_fetch(p, engine, url, wait_selector, timeout_ms)
-                if not _looks_like_antibot(html):
-                    return html, title, None
-                reasons.append(f"{engine}/antibot")
-                _dump_html(engine, series_name or "unknown", html)
+                html, title = _capture_page(page, extractor, series_name, browser_name)
+                verdict = watch.verdict(html, title)
             except Exception as e:
-                reasons.append(f"{engine}/{type(e).__name__}")
-            time.sleep(0.6)
+                if not _navigated(e):
+                    raise
+                html = title = None  # navegó durante la captura: se captura en el reintento
+
+        # Segundo intento si parece anti-bot (o si la página navegó sola)
+        if html is None or verdict.blocked:
+            if stored and verdict.blocked:
+                # La sesión guardada ya no pasa el challenge
+                sessions.invalidate(url, browser_name)
+            # Sin corte temprano: el reintento está para que el challenge se resuelva solo
+            _goto(page, watch, url, "networkidle", timeout_ms, browser_name, "goto_retry", early=False)
+            _wait_ready(page, wait_selector, ready, timeout_ms, browser_name)
+            html, title = _capture_page(page, extractor, series_name, browser_name)
+            verdict = watch.verdict(html, title)
+
+        if not verdict.blocked:
+            sessions.save(context, url, browser_name)
+        return html, title, verdict
+
+def fetch_html(url: str, wait_selector: Optional[str] = None, timeout_ms: Optional[int] = None,
+               series_name: Optional[str] = None,
+               extractor: Optional[ChapterExtractor] = None) -> Tuple[str, str, Optional[str]]:
+    """
+    Devuelve (html, title, antibot_reason); el motivo puede ser también un error de motor
+    ("firefox/TimeoutError"), solo los "<motor>/antibot:..." son challenges
+    - Con extractor, html es un PageSnapshot (ver _capture)
+    - Intenta Chromium, Firefox y WebKit, empezando por el que mejor le ha ido a este host
+    - Reutiliza los navegadores del pool de la corrida (un context nuevo por serie)
+    - Marca como antibot si scraper.antibot lo clasifica como challenge (el motivo va en
+      antibot_reason); guarda la página en el almacén de snapshots
+    - Sin timeout_ms, cada motor usa el timeout del host (scraper.budget); si se acabó el
+      presupuesto de la corrida no se prueba el siguiente motor
+    """
+    pool = get_pool()
+    reasons = []
+
+    for engine in engines.engine_order(url):
+        if reasons and budget.expired():
+            reasons.append("budget")
+            break
+        time.sleep(ratelimit.reserve(url))
+        try:
+            html, title, verdict = _try_fetch(pool, engine, url, wait_selector, timeout_ms or budget.timeout_ms(url),
+                                              extractor, series_name)
+            if not verdict.blocked:
+                engines.record(url, engine, True)
+                ratelimit.reward(url)
+                trace.annotate(engine=engine, html_len=getattr(html, "html_len", len(html)))
+                snapshots.save(series_name, url, engine, "ok", html)
+                return html, title, None
+            engines.record(url, engine, False)
+            ratelimit.penalize(url)
+            reasons.append(f"{engine}/antibot:{verdict.reason}")
+            snapshots.save(series_name, url, engine, "antibot", html)
+        except Exception as e:
+            engines.record(url, engine, False)
+            if type(e).__name__ == "TimeoutError":
+                ratelimit.penalize(url)
+            reasons.append(f"{engine}/{type(e).__name__}")
 
     return html if 'html' in locals() else "", title if 'title' in locals() else "", "; ".join(reasons) or "blocked"
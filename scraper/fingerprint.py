@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Huella de la lista de capítulos para no re-parsear páginas que no cambiaron.
+
+- HTML: hash de todos los <a ...>...</a> tal cual vienen (un regex sobre el texto, sin
+  armar DOM). Cualquier capítulo nuevo agrega un anchor, así que cambia la huella;
+  si cambia por ruido (comentarios, nonces) solo se pierde el atajo, no el capítulo.
+- PageSnapshot: hash de los pares (texto, href) que ya trajo el navegador.
+
+La huella incluye las reglas del extractor: si cambian, no se reutiliza lo guardado.
+Sin anchors no hay huella. Solo se guarda si el capítulo salió del scan de anchors: si
+vino de un fallback (texto de contenedor, elementos), ese texto puede cambiar con los
+mismos anchors, así que esas páginas siempre se parsean (ver backends._parse).
+FINGERPRINT=0 lo desactiva.
+"""
+import hashlib
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+from .sites.engine import ChapterExtractor, PageSnapshot
+
+FINGERPRINT_ENABLED = os.getenv("FINGERPRINT", "1") == "1"
+# Subir si cambia cómo se calcula, para invalidar las huellas guardadas
+VERSION = "3"
+
+ANCHOR_RE = re.compile(r"<a\b[^>]*>.*?</a\s*>", re.IGNORECASE | re.DOTALL)
+
+def _sorted_tiers(tiers) -> tuple:
+    # El repr de un frozenset cambia de orden con PYTHONHASHSEED: cada proceso daría otra huella
+    return tuple(tuple(sorted(t)) for t in tiers)
+
+def _rules(parser: ChapterExtractor) -> str:
+    return repr((VERSION, parser.name, parser.scope, _sorted_tiers(parser.text_tiers),
+                 _sorted_tiers(parser.href_tiers), tuple(sorted(parser.href_hints)),
+                 parser.min_major, parser.max_major, parser.max_digits, len(parser.fallbacks)))
+
+def of(html: str, parser: ChapterExtractor) -> Optional[str]:
+    if not FINGERPRINT_ENABLED or not html:
+        return None
+    h = hashlib.blake2b(_rules(parser).encode("utf-8"), digest_size=16)
+    n = 0
+    if isinstance(html, PageSnapshot):
+        for text, href in html.pairs:
+            h.update(f"{text}\t{href}\n".encode("utf-8"))
+            n += 1
+    else:
+        for m in ANCHOR_RE.finditer(html):
+            h.update(m.group(0).encode("utf-8", "surrogatepass"))
+            n += 1
+    return h.hexdigest() if n else None
+
+# (índice de la serie en series.yaml, URL): la misma URL puede estar dos veces en la lista
+Key = Tuple[Optional[int], str]
+
+# Huellas calculadas en esta corrida, por serie, hasta que main las guarde en el store
+pending: Dict[Key, Tuple[str, bool]] = {}
+
+def remember(key: Key, fp: Optional[str], hit: bool) -> None:
+    if fp:
+        pending[key] = (fp, hit)
+
+def take(key: Key) -> Tuple[Optional[str], bool]:
+    """(huella, fue acierto) de la serie; la saca de pending."""
+    return pending.pop(key, (None, False))
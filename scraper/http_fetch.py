@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Backend HTTP liviano (requests) para sitios que sirven la lista de capítulos en el HTML estático.
+
+Una sola Session con keep-alive y pool de conexiones para toda la corrida.
+Mismo contrato que fetch_html: devuelve (html, title, antibot_reason).
+"""
+import os
+import re
+import threading
+import time
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import antibot, budget, ratelimit, snapshots, trace
+from .fetchers import UA_MAP, EXTRA_HEADERS
+
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=1)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers.update({
+                "User-Agent": UA_MAP["chromium"],
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                **EXTRA_HEADERS,
+            })
+            _session = s
+        return _session
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.IGNORECASE)
+
+def _decode(resp: requests.Response) -> str:
+    """
+    Texto de la respuesta. requests usa ISO-8859-1 si Content-Type no trae charset, lo
+    que rompe los acentos ("Capítulo") de páginas UTF-8: en ese caso manda el
+    <meta charset>, después lo que detecte requests y por último UTF-8.
+    """
+    body = resp.content or b""
+    content_type = resp.headers.get("Content-Type", "")
+    candidates = []
+    if "charset=" in content_type.lower():
+        candidates.append(resp.encoding)
+    m = META_CHARSET_RE.search(body[:4096])
+    if m:
+        candidates.append(m.group(1).decode("ascii", "ignore"))
+    candidates += [resp.apparent_encoding, "utf-8"]
+    for enc in candidates:
+        if not enc:
+            continue
+        try:
+            return body.decode(enc)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return body.decode("utf-8", errors="replace")
+
+def _title_from_html(html: str) -> str:
+    m = TITLE_RE.search(html[:20000])
+    return re.sub(r"\s+", " ", m.group(1)).strip() if m else ""
+
+# Códigos con los que el sitio nos pide bajar el ritmo
+THROTTLE_STATUS = (403, 429, 503)
+
+def fetch_html_http(url: str, timeout_ms: Optional[int] = None,
+                    series_name: Optional[str] = None) -> Tuple[str, str, Optional[str]]:
+    """
+    (html, title, motivo de fallo). El motivo es "http/antibot:<motivo>" si scraper.antibot
+    ve un challenge, "http/<status>" para otras respuestas >= 400 y "http/<excepción>" si
+    no hubo respuesta. Sin timeout_ms se usa el del host según su historial (scraper.budget).
+    """
+    time.sleep(ratelimit.reserve(url))
+    timeout_ms = timeout_ms or budget.timeout_ms(url, "http_get")
+    try:
+        with trace.span("http_get", timeout_ms=timeout_ms) as sp:
+            resp = get_session().get(url, timeout=timeout_ms / 1000.0)
+            sp["status"] = resp.status_code
+            sp["bytes"] = len(resp.content)
+    except requests.Timeout as e:
+        ratelimit.penalize(url)
+        return "", "", f"http/{type(e).__name__}"
+    except requests.RequestException as e:
+        return "", "", f"http/{type(e).__name__}"
+
+    html = _decode(resp)
+    title = _title_from_html(html)
+    verdict = antibot.classify(html, resp.status_code, resp.headers, title)
+    if verdict.blocked:
+        trace.annotate(antibot=f"{verdict.confidence:.2f} {verdict.reason}")
+        ratelimit.penalize(url)
+        snapshots.save(series_name, url, "http", "antibot", html)
+        return html, title, f"http/antibot:{verdict.reason}"
+    if resp.status_code >= 400:
+        if resp.status_code in THROTTLE_STATUS:
+            ratelimit.penalize(url)
+        return html, title, f"http/{resp.status_code}"
+    ratelimit.reward(url)
+    trace.annotate(engine="http", html_len=len(html))
+    snapshots.save(series_name, url, "http", "ok", html)
+    return html, title, None
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Intercepción de peticiones en Playwright: los parsers solo necesitan anchors y su texto,
+así que no descargamos imágenes, fuentes, media ni trackers de terceros.
+
+- BLOCK_RESOURCE_TYPES: tipos de recurso bloqueados (default "image,font,media").
+- ROUTE_BLOCKING=0 desactiva la intercepción.
+- Cada sitio puede permitir URLs concretas con get_allowed_resources_for_url (scraper.sites).
+
+Las peticiones abortadas nunca se descargan, así que su tamaño no se puede medir: de
+ellas se reporta solo la cantidad por categoría. De las permitidas se suman los bytes
+que realmente viajaron (headers + body de la respuesta según request.sizes(), al
+terminar cada petición), así que cuentan también las respuestas chunked o comprimidas
+que no traen content-length.
+"""
+import os
+from typing import Dict, Optional, Sequence
+from urllib.parse import urlparse
+
+ROUTE_BLOCKING = os.getenv("ROUTE_BLOCKING", "1") == "1"
+DENY_TYPES = frozenset(t.strip() for t in os.getenv("BLOCK_RESOURCE_TYPES", "image,font,media").split(",") if t.strip())
+
+# Analítica/ads que no aportan nada al HTML. Ojo: nada de challenges.cloudflare.com aquí.
+TRACKER_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "static.cloudflareinsights.com",
+    "disqus.com",
+    "histats.com",
+    "popads.net",
+    "propellerads.com",
+)
+
+# Recursos del challenge de Cloudflare: bloquearlos impide que el challenge se resuelva
+ALWAYS_ALLOW = (
+    "challenges.cloudflare.com",
+    "/cdn-cgi/challenge-platform/",
+)
+
+class BlockStats:
+    def __init__(self):
+        self.blocked: Dict[str, int] = {}
+        self.allowed = 0
+        self.bytes_in = 0
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def add_blocked(self, category: str) -> None:
+        self.blocked[category] = self.blocked.get(category, 0) + 1
+
+    def summary(self) -> str:
+        total = sum(self.blocked.values())
+        detail = ", ".join(f"{k}={v}" for k, v in sorted(self.blocked.items())) or "-"
+        return (f"peticiones bloqueadas {total} ({detail}; sin bytes: no se descargan); "
+                f"permitidas {self.allowed}, {self.bytes_in / 1024:.0f} KB transferidos")
+
+STATS = BlockStats()
+
+def should_block(resource_type: str, req_url: str, allow: Sequence[str] = ()) -> Optional[str]:
+    """Devuelve la categoría por la que se bloquea la petición, o None si se deja pasar."""
+    if any(a in req_url for a in ALWAYS_ALLOW):
+        return None
+    if allow and any(a in req_url for a in allow):
+        return None
+    if resource_type in DENY_TYPES:
+        return resource_type
+    host = urlparse(req_url).netloc.lower()
+    if any(host == t or host.endswith("." + t) for t in TRACKER_HOSTS):
+        return "tracker"
+    return None
+
+def _transferred(sizes: Dict[str, int]) -> int:
+    # -1 si no se conoce (p. ej. respuesta de caché)
+    return max(0, sizes.get("responseHeadersSize") or 0) + max(0, sizes.get("responseBodySize") or 0)
+
+def _on_finished(request) -> None:
+    try:
+        STATS.bytes_in += _transferred(request.sizes())
+    except Exception:
+        pass  # el contexto se cerró antes de que llegaran los tamaños
+
+async def _on_finished_async(request) -> None:
+    try:
+        STATS.bytes_in += _transferred(await request.sizes())
+    except Exception:
+        pass
+
+def install(context, allow: Sequence[str] = ()) -> None:
+    """Instala el filtro en un BrowserContext de la API sync."""
+    if not ROUTE_BLOCKING:
+        return
+
+    def handler(route):
+        req = route.request
+        cat = should_block(req.resource_type, req.url, allow)
+        if cat:
+            STATS.add_blocked(cat)
+            route.abort()
+        else:
+            STATS.allowed += 1
+            route.continue_()
+
+    context.route("**/*", handler)
+    context.on("requestfinished", _on_finished)
+
+async def install_async(context, allow: Sequence[str] = ()) -> None:
+    """Instala el filtro en un BrowserContext de la API async."""
+    if not ROUTE_BLOCKING:
+        return
+
+    async def handler(route):
+        req = route.request
+        cat = should_block(req.resource_type, req.url, allow)
+        if cat:
+            STATS.add_blocked(cat)
+            await route.abort()
+        else:
+            STATS.allowed += 1
+            await route.continue_()
+
+    await context.route("**/*", handler)
+    context.on("requestfinished", _on_finished_async)
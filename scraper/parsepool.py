@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Etapa de parse en procesos aparte, para que el fetch no espere al parser (modo sync).
+
+Mientras un worker arma el DOM de una lista de capítulos grande, el hilo principal ya
+navega la serie siguiente. El HTML crudo va a un ProcessPoolExecutor de PARSE_WORKERS
+procesos (default 2; 0 = parsear en el mismo hilo, como antes) por una cola acotada:
+con PARSE_QUEUE páginas (default 4) esperando o en parse, el fetch se frena hasta que se
+libere un lugar, así la memoria no crece con la lista.
+
+No pasan por el pool los PageSnapshot (ya vienen escaneados del navegador), el nivel
+HTTP de FETCH_BACKEND=auto ni las páginas cuya huella coincide con la guardada
+(scraper.fingerprint). Si la config no deja HTML crudo (backends.parses_raw_html) main
+no crea la etapa.
+
+Los workers se crean con PARSE_START (default forkserver): no heredan los navegadores ni
+los sockets del proceso principal. Al final de la corrida STATS dice cuánto se usó la cola
+y qué fracción del tiempo estuvieron ocupados los workers.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from . import trace
+from .sites.engine import ChapterExtractor
+
+PARSE_WORKERS = max(0, int(os.getenv("PARSE_WORKERS", "2")))
+PARSE_QUEUE = max(1, int(os.getenv("PARSE_QUEUE", "4")))
+PARSE_START = os.getenv("PARSE_START", "forkserver")
+
+def _work(parser: ChapterExtractor, html: str) -> Tuple[Optional[str], bool, float]:
+    """Corre en el worker: (capítulo, salió de los anchors, ms de parse)."""
+    t0 = time.perf_counter()
+    cur, anchored = parser.parse(html)
+    return cur, anchored, (time.perf_counter() - t0) * 1000
+
+class ParseStats:
+    """Uso de la cola y de los workers en la corrida."""
+    def __init__(self):
+        self.parsed = 0
+        self.depths: List[int] = []
+        self.blocked_ms = 0.0
+        self.busy_ms = 0.0
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def summary(self, workers: int = PARSE_WORKERS) -> str:
+        wall = (self.last - self.first) * 1000 if self.first is not None and self.last is not None else 0.0
+        util = 100 * self.busy_ms / (workers * wall) if wall > 0 and workers else 0.0
+        mean = sum(self.depths) / len(self.depths) if self.depths else 0.0
+        return (f"{self.parsed} páginas en {workers} workers, ocupados {util:.0f}% del tiempo "
+                f"({self.busy_ms / 1000:.1f}s de parse en {wall / 1000:.1f}s); cola máx "
+                f"{max(self.depths, default=0)}/{PARSE_QUEUE} (media {mean:.1f}), "
+                f"fetch frenado por cola llena {self.blocked_ms / 1000:.1f}s")
+
+STATS = ParseStats()
+
+class Pending:
+    """Resultado de un parse que corre en un worker. result() se llama desde el hilo principal."""
+    def __init__(self, future: Future, where: dict, parser_name: str):
+        self._future = future
+        self._where = where
+        self._parser_name = parser_name
+        # Si el capítulo salió del scan de anchors (se sabe tras result())
+        self.anchored = False
+        self._then: List[Callable[[Any], Any]] = []
+        self._on_error: List[Callable[[BaseException], Any]] = []
+
+    def then(self, fn: Callable[[Any], Any],
+             on_error: Optional[Callable[[BaseException], Any]] = None) -> "Pending":
+        """
+        Encadena fn: result() devuelve fn(lo anterior). Si el parse falla se llama on_error(e)
+        antes de propagar la excepción. Todo corre en el hilo que llama a result().
+        """
+        self._then.append(fn)
+        if on_error is not None:
+            self._on_error.append(on_error)
+        return self
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self) -> Any:
+        try:
+            cur, self.anchored, ms = self._future.result()
+        except Exception as e:
+            trace.record("parse", 0.0, parser=self._parser_name, pool=True, error=type(e).__name__, **self._where)
+            for fn in self._on_error:
+                fn(e)
+            raise
+        trace.record("parse", ms, parser=self._parser_name, pool=True, chapter=cur, fingerprint_hit=False,
+                     **self._where)
+        value: Any = cur
+        for fn in self._then:
+            value = fn(value)
+        return value
+
+class ParseStage:
+    def __init__(self, workers: int = PARSE_WORKERS, depth: int = PARSE_QUEUE):
+        self.workers = workers
+        self.depth = depth
+        self._slots = threading.BoundedSemaphore(depth)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context(PARSE_START if PARSE_START in methods else None)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        return self._executor
+
+    def _done(self, fut: Future) -> None:
+        with self._lock:
+            self._inflight -= 1
+            STATS.last = time.monotonic()
+            if not fut.cancelled() and fut.exception() is None:
+                STATS.busy_ms += fut.result()[2]
+        self._slots.release()
+
+    def submit(self, parser: ChapterExtractor, html: str) -> Pending:
+        """Encola el parse; si la cola está llena espera a que se libere un lugar."""
+        t0 = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            self._slots.acquire()
+            STATS.blocked_ms += (time.monotonic() - t0) * 1000
+        with self._lock:
+            self._inflight += 1
+            STATS.parsed += 1
+            STATS.depths.append(self._inflight)
+            if STATS.first is None:
+                STATS.first = t0
+        try:
+            fut = self._pool().submit(_work, parser, str(html))
+        except Exception:
+            with self._lock:
+                self._inflight -= 1
+            self._slots.release()
+            raise
+        fut.add_done_callback(self._done)
+        return Pending(fut, trace.where(), parser.name)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+_stage: Optional[ParseStage] = None
+
+def stage() -> Optional[ParseStage]:
+    """La etapa compartida (se crea al primer uso); None con PARSE_WORKERS=0."""
+    global _stage
+    if PARSE_WORKERS <= 0:
+        return None
+    if _stage is None:
+        _stage = ParseStage()
+    return _stage
+
+def shutdown() -> None:
+    global _stage
+    if _stage is not None:
+        _stage.shutdown()
+        _stage = None
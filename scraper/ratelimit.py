@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Rate limiter adaptativo por host (token bucket).
+
+- Cada host arranca con un intervalo de SCRAPE_SLEEP segundos entre peticiones.
+- Anti-bot, timeout o 429/403/503: el intervalo se duplica (hasta RATE_MAX_INTERVAL).
+- RATE_SPEEDUP_AFTER fetches limpios seguidos: el intervalo baja un 20% (hasta RATE_MIN_INTERVAL).
+- Los intervalos aprendidos se guardan en state/ratelimit.json.
+
+reserve() no duerme: devuelve cuántos segundos esperar, así sirve igual para
+time.sleep (modo sync) y asyncio.sleep (modo async).
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from .utils import state_path, load_json, save_json
+
+DEFAULT_INTERVAL = float(os.getenv("SCRAPE_SLEEP", "0.6"))
+MIN_INTERVAL = float(os.getenv("RATE_MIN_INTERVAL", "0.2"))
+MAX_INTERVAL = float(os.getenv("RATE_MAX_INTERVAL", "60"))
+BURST = max(1.0, float(os.getenv("RATE_BURST", "1")))
+SPEEDUP_AFTER = int(os.getenv("RATE_SPEEDUP_AFTER", "3"))
+RATELIMIT_FILE = state_path("ratelimit.json")
+
+class _Bucket:
+    __slots__ = ("interval", "tokens", "last", "streak")
+
+    def __init__(self, interval: float):
+        self.interval = min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+        self.tokens = BURST
+        self.last = time.monotonic()
+        self.streak = 0
+
+_lock = threading.Lock()
+_buckets: Dict[str, _Bucket] = {}
+_learned: Optional[Dict[str, float]] = None
+
+def _host(url_or_host: str) -> str:
+    if "://" in url_or_host:
+        return urlparse(url_or_host).netloc.lower()
+    return url_or_host.lower()
+
+def _bucket(host: str) -> _Bucket:
+    global _learned
+    if _learned is None:
+        _learned = load_json(RATELIMIT_FILE)
+    b = _buckets.get(host)
+    if b is None:
+        b = _buckets[host] = _Bucket(float(_learned.get(host, DEFAULT_INTERVAL)))
+    return b
+
+def reserve(url: str) -> float:
+    """Toma un token del host y devuelve los segundos que hay que esperar antes de usarlo."""
+    with _lock:
+        b = _bucket(_host(url))
+        now = time.monotonic()
+        b.tokens = min(BURST, b.tokens + (now - b.last) / b.interval)
+        b.last = now
+        b.tokens -= 1.0
+        # tokens negativos = reservas encoladas; cada una espera un intervalo más
+        return 0.0 if b.tokens >= 0 else -b.tokens * b.interval
+
+def penalize(url: str) -> float:
+    with _lock:
+        b = _bucket(_host(url))
+        b.interval = min(MAX_INTERVAL, b.interval * 2.0)
+        b.streak = 0
+        return b.interval
+
+def reward(url: str) -> float:
+    with _lock:
+        b = _bucket(_host(url))
+        b.streak += 1
+        if b.streak >= SPEEDUP_AFTER:
+            b.interval = max(MIN_INTERVAL, b.interval * 0.8)
+            b.streak = 0
+        return b.interval
+
+def save_rates() -> Dict[str, float]:
+    with _lock:
+        if _learned is None:
+            return {}
+        for host, b in _buckets.items():
+            _learned[host] = round(b.interval, 3)
+        save_json(RATELIMIT_FILE, _learned)
+        return dict(sorted(_learned.items()))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Planificador incremental: decide qué series toca revisar en esta corrida.
+
+Consulta en el store (scraper.store) los momentos en que cambió el capítulo de cada
+URL y su última revisión exitosa. La cadencia es la mediana de los intervalos entre
+cambios. Una serie toca si:
+  - no hay historia suficiente (menos de 2 cambios),
+  - está en su ventana de salida (pasó SCHEDULE_WINDOW de la cadencia desde el último
+    cambio, y todavía no lleva SCHEDULE_HIATUS cadencias sin cambiar), o
+  - pasaron SCHEDULE_MAX_GAP_HOURS desde la última revisión (atrasos, hiatos).
+Cada SCHEDULE_SWEEP_HOURS se fuerza una pasada completa. SCHEDULE=0 o
+SCHEDULE_FULL=1 revisan todo.
+"""
+import os
+import statistics
+import time
+from typing import Optional, Tuple
+
+from . import store
+
+SCHEDULE_ENABLED = os.getenv("SCHEDULE", "1") == "1"
+FORCE_FULL = os.getenv("SCHEDULE_FULL", "0") == "1"
+WINDOW = float(os.getenv("SCHEDULE_WINDOW", "0.8"))
+HIATUS = float(os.getenv("SCHEDULE_HIATUS", "3"))
+MAX_GAP_S = float(os.getenv("SCHEDULE_MAX_GAP_HOURS", "24")) * 3600
+SWEEP_S = float(os.getenv("SCHEDULE_SWEEP_HOURS", "168")) * 3600
+KEEP_CHANGES = 8
+
+_full_sweep = False
+_prev_sweep = "0"
+
+def cadence(url: str) -> Optional[float]:
+    """Mediana (s) entre cambios de capítulo, o None si no hay historia suficiente."""
+    changes = store.change_times(url, KEEP_CHANGES)
+    if len(changes) < 2:
+        return None
+    gaps = [b - a for a, b in zip(changes, changes[1:]) if b > a]
+    return statistics.median(gaps) if gaps else None
+
+def start_run(now: Optional[float] = None) -> bool:
+    """Decide si esta corrida es una pasada completa. Devuelve True si lo es."""
+    global _full_sweep, _prev_sweep
+    now = time.time() if now is None else now
+    _prev_sweep = store.get_meta("last_sweep", "0")
+    _full_sweep = (not SCHEDULE_ENABLED or FORCE_FULL or now - float(_prev_sweep) >= SWEEP_S)
+    if _full_sweep:
+        mark_sweep(now)
+    return _full_sweep
+
+def mark_sweep(ts: float) -> None:
+    store.set_meta("last_sweep", ts)
+
+def cancel_sweep() -> None:
+    """La pasada completa no terminó (presupuesto agotado): la próxima corrida la repite."""
+    store.set_meta("last_sweep", _prev_sweep)
+
+def is_due(url: str, now: Optional[float] = None) -> Tuple[bool, str]:
+    """(toca, motivo). El motivo sirve para el log."""
+    if _full_sweep:
+        return True, "pasada completa"
+    now = time.time() if now is None else now
+    url = (url or "").strip()
+    checked = store.last_checked(url)
+    if not checked:
+        return True, "sin revisión previa"
+    if now - checked >= MAX_GAP_S:
+        return True, f"{(now - checked) / 3600:.0f}h sin revisar"
+
+    every = cadence(url)
+    if every is None:
+        return True, "sin cadencia"
+    last_change = store.change_times(url, 1)[-1]
+    since = now - last_change
+    if WINDOW * every <= since <= HIATUS * every:
+        return True, f"en ventana (cada ~{every / 86400:.1f}d)"
+    next_h = (min(last_change + WINDOW * every, checked + MAX_GAP_S) - now) / 3600
+    return False, f"cada ~{every / 86400:.1f}d, próxima en ~{max(0.0, next_h):.0f}h"
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Sesiones por host que ya pasaron el challenge de Cloudflare (cookies + localStorage).
+
+Tras una carga sin anti-bot se guarda el storage_state del context en
+state/sessions/<host>.<engine>.json y el siguiente context de ese host lo reutiliza.
+Va por motor porque cf_clearance queda ligada al User-Agent que resolvió el challenge.
+Caduca si no se renueva con una carga limpia en SESSION_TTL_HOURS y se borra en
+cuanto vuelve a aparecer un challenge. Se escribe de forma atómica porque en modo
+async otra serie del mismo host puede estar leyéndola.
+"""
+import os
+import re
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from .utils import state_path, save_json
+
+SESSIONS_DIR = state_path("sessions")
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_HOURS", "12")) * 3600
+
+def session_file(url: str, engine: str) -> str:
+    host = re.sub(r"[^a-z0-9.\-]+", "_", urlparse(url).netloc.lower())
+    return os.path.join(SESSIONS_DIR, f"{host}.{engine}.json")
+
+def storage_state_for(url: str, engine: str) -> Optional[str]:
+    """Ruta del storage_state vigente para (host, engine), o None."""
+    path = session_file(url, engine)
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+    if age > SESSION_TTL_S:
+        invalidate(url, engine)
+        return None
+    return path
+
+def invalidate(url: str, engine: str) -> None:
+    try:
+        os.remove(session_file(url, engine))
+    except OSError:
+        pass
+
+def save(context, url: str, engine: str) -> None:
+    try:
+        save_json(session_file(url, engine), context.storage_state())
+    except Exception:
+        pass
+
+async def save_async(context, url: str, engine: str) -> None:
+    try:
+        save_json(session_file(url, engine), await context.storage_state())
+    except Exception:
+        pass
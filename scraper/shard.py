@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Reparto determinista de series entre workers (--shard i/N) y unión de sus resultados (--merge).
+
+La serie va al shard crc32(host) % N, con el host normalizado (Series.host): todas las
+series de un host caen en el mismo worker, así el rate limit por host sigue valiendo.
+Cada worker escribe RESULTS_DIR/shard-<i>-of-<N>.json; el merge los junta, aplica los
+cambios al store y manda un solo resumen.
+"""
+import glob
+import os
+import time
+import zlib
+from typing import Any, Dict, List, Tuple
+
+from .utils import load_json, save_json
+
+RESULTS_DIR = os.getenv("RESULTS_DIR", "results")
+
+def parse_spec(spec: str) -> Tuple[int, int]:
+    """'1/4' -> (1, 4). El índice va de 0 a N-1."""
+    try:
+        index, count = (int(x) for x in spec.split("/", 1))
+    except ValueError:
+        raise ValueError(f"shard inválido '{spec}' (formato i/N)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"shard inválido '{spec}' (0 <= i < N)")
+    return index, count
+
+def shard_of(host: str, count: int) -> int:
+    # crc32 y no hash(): tiene que dar lo mismo en cada proceso y en cada máquina
+    return zlib.crc32(host.encode("utf-8")) % count
+
+def partial_path(index: int, count: int, results_dir: str = RESULTS_DIR) -> str:
+    return os.path.join(results_dir, f"shard-{index}-of-{count}.json")
+
+def write_partial(index: int, count: int, full_sweep: bool, results: List[Dict[str, Any]],
+                  results_dir: str = RESULTS_DIR) -> str:
+    path = partial_path(index, count, results_dir)
+    save_json(path, {"shard": index, "count": count, "full_sweep": full_sweep,
+                     "finished": time.time(), "results": results})
+    return path
+
+def load_partials(results_dir: str = RESULTS_DIR) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[int]]:
+    """
+    (resultados en el orden de series.yaml, cabeceras de cada parcial, shards que faltan).
+    Si hay parciales de distintos N se usa el N más reciente.
+    """
+    parts = [load_json(p) for p in sorted(glob.glob(os.path.join(results_dir, "shard-*-of-*.json")))]
+    parts = [p for p in parts if "results" in p]
+    if not parts:
+        return [], [], []
+    count = max(parts, key=lambda p: p.get("finished", 0))["count"]
+    parts = [p for p in parts if p["count"] == count]
+    missing = sorted(set(range(count)) - {p["shard"] for p in parts})
+    results = sorted((r for p in parts for r in p["results"]), key=lambda r: r.get("idx", 0))
+    heads = [{k: v for k, v in p.items() if k != "results"} for p in parts]
+    return results, heads, missing
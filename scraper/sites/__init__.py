@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
-from typing import Callable, Optional
+from typing import Optional, Tuple
+
+from .engine import ChapterExtractor
+from .feed import FeedAdapter
+from .readiness import Readiness
 
 from .animebbg import parse_latest_chapter as parse_animebbg
 from .m440 import parse_latest_chapter as parse_m440
-from .bokugents import parse_latest_chapter as parse_bokugents
-from .mangasnosekai import parse_latest_chapter as parse_msk
+from .bokugents import parse_latest_chapter as parse_bokugents, FEED as feed_bokugents
+from .mangasnosekai import parse_latest_chapter as parse_msk, FEED as feed_msk
 from .zonatmo import parse_latest_chapter as parse_zonatmo
 
-def get_parser_for_url(url: str) -> Callable[[str], str]:
+def get_parser_for_url(url: str) -> ChapterExtractor:
     u = url.lower()
     if "animebbg.net" in u:
         return parse_animebbg
@@ -37,3 +41,43 @@ def get_wait_selector_for_url(url: str) -> Optional[str]:
     if "bokugents.com" in u:
         return "a"
     return None
+
+# Madara/WP Manga: la lista de capítulos llega por AJAX (admin-ajax.php o <serie>/ajax/chapters/)
+_READY_MADARA = Readiness("li.wp-manga-chapter a, .chapter-list a, .chapter-item a", xhr=("/ajax/chapters", "admin-ajax.php"))
+_READY_ANIMEBBG = Readiness(".structItemContainer a, .block-container a")
+_READY_M440 = Readiness("a[href*='/chapter'], a[href*='/cap']")
+_READY_DEFAULT = Readiness("a")
+
+def get_readiness_for_url(url: str) -> Readiness:
+    """Cuándo dar por cargada la página tras el scroll (ver scraper.sites.readiness)."""
+    u = url.lower()
+    if "mangasnosekai.com" in u:
+        return _READY_MADARA
+    if "animebbg.net" in u:
+        return _READY_ANIMEBBG
+    if "m440.in" in u:
+        return _READY_M440
+    return _READY_DEFAULT
+
+def get_feed_for_url(url: str) -> Optional[FeedAdapter]:
+    """Feed de últimas actualizaciones del host, si el sitio tiene uno (ver scraper.feeds)."""
+    u = url.lower()
+    if "bokugents.com" in u:
+        return feed_bokugents
+    if "mangasnosekai.com" in u:
+        return feed_msk
+    return None
+
+def get_allowed_resources_for_url(url: str) -> Tuple[str, ...]:
+    """
+    Substrings de URL que NO se bloquean aunque su tipo esté en la deny-list
+    (ver scraper.netfilter). Vacío = solo aplica la política por defecto.
+    """
+    u = url.lower()
+    if "mangasnosekai.com" in u:
+        # WP Manga carga la lista de capítulos por AJAX
+        return ("/wp-admin/admin-ajax.php", "/ajax/chapters")
+    if "zonatmo.com" in u:
+        # La lista de capítulos depende de su propio JS de upload
+        return ("zonatmo.com/js/",)
+    return ()
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de extracción de capítulos compartido por todos los sitios.
+
+Cada sitio es un ChapterExtractor configurado con reglas declarativas:
+  - scope:       selector CSS de los anchors candidatos (región de la lista de capítulos)
+  - text_kinds:  patrones a probar en el texto del anchor, en orden de prioridad;
+                 "cap|ch|ep" agrupa varios en un mismo nivel (gana el más a la izquierda)
+  - href_kinds:  patrones a probar en el href si el texto no tuvo match
+  - href_hints:  si se dan, el href solo se mira cuando contiene alguno de estos segmentos
+  - fallbacks:   qué hacer si ningún anchor dio candidato (container_text / element_text / anchor_numbers)
+  - min_major/max_major/max_digits: cotas de cordura del número de capítulo
+
+Usa lxml (parser en C) si está instalado y cae a BeautifulSoup/html.parser si no.
+Todos los patrones van en una sola regex compilada y el máximo se lleva sobre la marcha.
+"""
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..utils import comparable_tuple, sanitize_chapter
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    HAVE_LXML = True
+except ImportError:  # pragma: no cover - depende del entorno
+    HAVE_LXML = False
+
+KINDS = ("cap", "ch", "ep", "hash")
+CAP_CH_EP = "cap|ch|ep"
+
+# Acepta Capítulo/Cap./Chapter/Ch./Episodio/Ep./# y coma decimal
+CHAPTER_RE = re.compile(
+    r"(?:(?P<cap>Cap(?:[íi]tulo)?|Cap\.)|(?P<ch>Ch(?:apter|\.))|(?P<ep>Episodio|Ep\.)|(?P<hash>\#))"
+    r"\s*(?P<num>\d+(?:[.,]\d+)?)",
+    re.IGNORECASE,
+)
+ANYNUM_RE = re.compile(r"\b(\d{1,4}(?:[.,]\d{1,2})?)\b")
+
+Fallback = Tuple  # ("container", selectors, kinds) | ("elements", selector, kinds) | ("anchor_numbers", keyword_re)
+
+def _tiers(kinds: Sequence[str]) -> Tuple[frozenset, ...]:
+    return tuple(frozenset(k.split("|")) for k in kinds)
+
+def _kind(m) -> str:
+    return m.group("cap") and "cap" or m.group("ch") and "ch" or m.group("ep") and "ep" or "hash"
+
+def container_text(*selectors: str, kinds: Sequence[str] = ("cap", "ch", "ep")) -> Fallback:
+    """Texto completo del primer elemento de cada selector; todos los matches. Para en el primero con candidatos."""
+    return ("container", selectors, frozenset(kinds))
+
+def element_text(selector: str, kinds: Sequence[str] = KINDS) -> Fallback:
+    """Texto de cada elemento que cumpla el selector; primer match por prioridad de kinds."""
+    return ("elements", selector, _tiers(kinds))
+
+def anchor_numbers(keyword: str) -> Fallback:
+    """Anchors cuyo texto menciona capítulo: cualquier número suelto cuenta."""
+    return ("anchor_numbers", re.compile(keyword, re.IGNORECASE))
+
+def first_match(text: str, tiers: Sequence[frozenset]) -> Optional[str]:
+    """
+    Número del match del tier más prioritario presente en text (una sola pasada de regex).
+    Dentro de un tier ("cap|ch|ep") gana el match más a la izquierda.
+    """
+    if not text:
+        return None
+    found: Dict[int, str] = {}
+    for m in CHAPTER_RE.finditer(text):
+        kind = _kind(m)
+        for i, tier in enumerate(tiers):
+            if kind in tier:
+                if i == 0:
+                    return m.group("num")
+                found.setdefault(i, m.group("num"))
+                break
+    return found[min(found)] if found else None
+
+def all_matches(text: str, kinds: frozenset) -> Iterable[str]:
+    for m in CHAPTER_RE.finditer(text or ""):
+        if _kind(m) in kinds:
+            yield m.group("num")
+
+class _Best:
+    """Lleva el máximo (por comparable_tuple) sin acumular ni ordenar candidatos."""
+    __slots__ = ("value", "key", "count")
+
+    def __init__(self):
+        self.value: Optional[str] = None
+        self.key = None
+        self.count = 0
+
+    def offer(self, chapter: str) -> None:
+        key = comparable_tuple(chapter)
+        self.count += 1
+        # >= : a igualdad gana el último, como el sort estable + [-1] de los parsers viejos
+        if self.key is None or key >= self.key:
+            self.value, self.key = chapter, key
+
+# --- Adaptadores de DOM ------------------------------------------------------
+# Todos exponen anchors(scope) -> [(texto, href)], first_text(sel) y all_texts(sel).
+
+class _LxmlDoc:
+    _css: Dict[str, Callable] = {}
+
+    def __init__(self, html: str):
+        try:
+            self.root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # str con declaración de encoding XML: lxml exige bytes
+            self.root = lxml.html.document_fromstring(html.encode("utf-8"))
+
+    def _sel(self, selector: str):
+        sel = self._css.get(selector)
+        if sel is None:
+            sel = self._css[selector] = CSSSelector(selector)
+        return sel
+
+    @staticmethod
+    def _text(el) -> str:
+        return " ".join(el.itertext())
+
+    def anchors(self, scope: str) -> Iterable[Tuple[str, str]]:
+        return ((self._text(a), a.get("href") or "") for a in self._sel(scope)(self.root))
+
+    def first_text(self, selector: str) -> Optional[str]:
+        found = self._sel(selector)(self.root)
+        return self._text(found[0]) if found else None
+
+    def all_texts(self, selector: str) -> List[str]:
+        return [self._text(el) for el in self._sel(selector)(self.root)]
+
+class _SoupDoc:
+    def __init__(self, html: str):
+        from bs4 import BeautifulSoup
+        self.root = BeautifulSoup(html, "html.parser")
+
+    def anchors(self, scope: str) -> Iterable[Tuple[str, str]]:
+        return ((a.get_text(" ", strip=True), a.get("href") or "") for a in self.root.select(scope))
+
+    def first_text(self, selector: str) -> Optional[str]:
+        el = self.root.select_one(selector)
+        return el.get_text(" ", strip=True) if el is not None else None
+
+    def all_texts(self, selector: str) -> List[str]:
+        return [el.get_text(" ", strip=True) for el in self.root.select(selector)]
+
+def parse_document(html: str):
+    return _LxmlDoc(html) if HAVE_LXML else _SoupDoc(html)
+
+class PageSnapshot(str):
+    """
+    Resultado de la extracción dentro del navegador (ver page_script).
+
+    Como str vale el inicio del HTML (PROBE_CHARS), suficiente para detectar anti-bot,
+    sacar el <title> y volcar diagnósticos; el DOM completo nunca viaja a Python.
+    `pairs` son los (texto, href) del scope del sitio y `fallback` los textos que
+    piden los fallbacks (solo se piden si los anchors no dieron candidato).
+    """
+
+    def __new__(cls, probe: str, anchors: List[Tuple[str, str]], html_len: int):
+        obj = str.__new__(cls, probe or "")
+        obj.pairs = [(t or "", h or "") for t, h in anchors]
+        obj.html_len = html_len
+        obj.fallback: Dict[str, List[str]] = {}
+        obj.best: Optional[_Best] = None
+        return obj
+
+    def anchors(self, scope: str) -> List[Tuple[str, str]]:
+        return self.pairs
+
+    def first_text(self, selector: str) -> Optional[str]:
+        texts = self.fallback.get(selector) or []
+        return texts[0] if texts else None
+
+    def all_texts(self, selector: str) -> List[str]:
+        return self.fallback.get(selector) or []
+
+# Cuánto HTML se trae en modo in-page (diagnósticos, snapshots y la ventana de scraper.antibot)
+PROBE_CHARS = 120000
+
+_TEXT_OF_JS = """
+  const textOf = (el) => {
+    const parts = [];
+    const w = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    while (w.nextNode()) parts.push(w.currentNode.nodeValue);
+    return parts.join(" ");
+  };
+"""
+
+# Anchors del scope + inicio del HTML; el DOM se serializa en el navegador pero solo viaja el recorte
+ANCHORS_JS = "(cfg) => {" + _TEXT_OF_JS + """
+  const anchors = [];
+  for (const a of document.querySelectorAll(cfg.scope)) anchors.push([textOf(a), a.getAttribute("href") || ""]);
+  const html = document.documentElement ? document.documentElement.outerHTML : "";
+  return {anchors: anchors, probe: html.slice(0, cfg.probe), length: html.length};
+}"""
+
+# Textos que necesitan los fallbacks: primer elemento (first) o todos (all) por selector
+FALLBACK_JS = "(cfg) => {" + _TEXT_OF_JS + """
+  const out = {};
+  for (const sel of cfg.first) { const el = document.querySelector(sel); out[sel] = el ? [textOf(el)] : []; }
+  for (const sel of cfg.all) out[sel] = Array.from(document.querySelectorAll(sel), textOf);
+  return out;
+}"""
+
+# --- Extractor ---------------------------------------------------------------
+
+class ChapterExtractor:
+    def __init__(self, name: str, scope: str = "a",
+                 text_kinds: Sequence[str] = KINDS, href_kinds: Sequence[str] = KINDS,
+                 href_hints: Sequence[str] = (), fallbacks: Sequence[Fallback] = (),
+                 min_major: int = 0, max_major: int = 1000, max_digits: int = 4):
+        self.name = name
+        self.scope = scope
+        self.text_tiers = _tiers(text_kinds)
+        self.href_tiers = _tiers(href_kinds)
+        self.href_hints = tuple(href_hints)
+        self.fallbacks = tuple(fallbacks)
+        self.min_major = min_major
+        self.max_major = max_major
+        self.max_digits = max_digits
+
+    def __repr__(self) -> str:
+        return f"ChapterExtractor({self.name!r})"
+
+    def _sane(self, raw: str) -> Optional[str]:
+        try:
+            cap = sanitize_chapter(raw.replace(",", "."))
+            ent = cap.split(".", 1)[0]
+            if len(ent) > self.max_digits:
+                return None
+            if not (self.min_major <= int(ent) <= self.max_major):
+                return None
+            return cap
+        except (ValueError, AttributeError):
+            return None
+
+    def _anchor(self, text: str, href: str) -> Optional[str]:
+        raw = first_match(text, self.text_tiers)
+        if raw is None and self.href_tiers:
+            if not self.href_hints or any(h in href.lower() for h in self.href_hints):
+                raw = first_match(href, self.href_tiers)
+        return raw
+
+    def anchor_chapter(self, text: str, href: str) -> Optional[str]:
+        """Capítulo (ya saneado) de un anchor suelto, con las mismas reglas que la lista."""
+        raw = self._anchor(text, href)
+        return self._sane(raw) if raw is not None else None
+
+    def scan_anchors(self, anchors: Iterable[Tuple[str, str]]) -> _Best:
+        best = _Best()
+        for text, href in anchors:
+            raw = self._anchor(text, href)
+            if raw is not None:
+                cap = self._sane(raw)
+                if cap is not None:
+                    best.offer(cap)
+        return best
+
+    def _fallback(self, src, spec: Fallback) -> _Best:
+        best = _Best()
+        kind = spec[0]
+        if kind == "container":
+            for sel in spec[1]:
+                text = src.first_text(sel)
+                if text is None:
+                    continue
+                for raw in all_matches(text, spec[2]):
+                    cap = self._sane(raw)
+                    if cap is not None:
+                        best.offer(cap)
+                if best.count:
+                    break
+        elif kind == "elements":
+            for text in src.all_texts(spec[1]):
+                raw = first_match(text, spec[2])
+                cap = self._sane(raw) if raw is not None else None
+                if cap is not None:
+                    best.offer(cap)
+        elif kind == "anchor_numbers":
+            for t, _ in src.anchors(self.scope):
+                if spec[1].search(t):
+                    for m in ANYNUM_RE.finditer(t):
+                        cap = self._sane(m.group(1))
+                        if cap is not None:
+                            best.offer(cap)
+        return best
+
+    # --- modo in-page (page.evaluate) ---
+
+    def page_config(self) -> Dict:
+        return {"scope": self.scope, "probe": PROBE_CHARS}
+
+    def fallback_config(self) -> Dict:
+        first: List[str] = []
+        every: List[str] = []
+        for spec in self.fallbacks:
+            if spec[0] == "container":
+                first.extend(spec[1])
+            elif spec[0] == "elements":
+                every.append(spec[1])
+        return {"first": first, "all": every}
+
+    def snapshot(self, data: Dict) -> PageSnapshot:
+        """Arma el PageSnapshot a partir de lo que devolvió ANCHORS_JS y deja hecho el scan de anchors."""
+        snap = PageSnapshot(data.get("probe") or "", data.get("anchors") or [], int(data.get("length") or 0))
+        snap.best = self.scan_anchors(snap.pairs)
+        return snap
+
+    def needs_fallback(self, snap: PageSnapshot) -> bool:
+        cfg = self.fallback_config()
+        return not snap.best.count and bool(cfg["first"] or cfg["all"])
+
+    def parse(self, html: str) -> Tuple[Optional[str], bool]:
+        """(capítulo, salió del scan de anchors). False si vino de un fallback o no hubo capítulo."""
+        if isinstance(html, PageSnapshot):
+            src = html
+            best = html.best if html.best is not None else self.scan_anchors(html.pairs)
+        elif not html:
+            return None, False
+        else:
+            try:
+                src = parse_document(html)
+            except Exception:
+                return None, False
+            best = self.scan_anchors(src.anchors(self.scope))
+        if best.count:
+            return best.value, True
+
+        for spec in self.fallbacks:
+            best = self._fallback(src, spec)
+            if best.count:
+                return best.value, False
+        return None, False
+
+    def __call__(self, html: str) -> Optional[str]:
+        return self.parse(html)[0]
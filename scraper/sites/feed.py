@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Feeds de "últimas actualizaciones" por host: una sola página cubre muchas series.
+
+Un FeedAdapter declara la página del feed y cómo reconocer, en el href de un anchor,
+la serie (slug) y si apunta a un capítulo. El número sale del ChapterExtractor del
+sitio (mismas reglas y cotas que la página de la serie). parse() devuelve, por slug,
+el capítulo mayor visto y cuántos anchors de capítulo tenía.
+"""
+import re
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from ..utils import comparable_tuple
+from .engine import ChapterExtractor, PageSnapshot, parse_document
+
+class FeedAdapter:
+    def __init__(self, name: str, url: str, extractor: ChapterExtractor,
+                 series_path: str = r"^/manga/(?P<slug>[^/?#]+)/?(?P<rest>[^?#]*)",
+                 wait_selector: Optional[str] = None):
+        self.name = name
+        self.url = url
+        self.extractor = extractor
+        self.series_re = re.compile(series_path, re.IGNORECASE)
+        self.wait_selector = wait_selector
+
+    def __repr__(self) -> str:
+        return f"FeedAdapter({self.name!r}, {self.url!r})"
+
+    def _split(self, href: str) -> Tuple[Optional[str], str]:
+        m = self.series_re.match(urlparse((href or "").strip()).path)
+        if not m:
+            return None, ""
+        return m.group("slug").lower(), m.group("rest").strip("/")
+
+    def series_key(self, url: str) -> Optional[str]:
+        """Slug de la serie para la URL de su página (None si la URL no tiene la forma del sitio)."""
+        slug, rest = self._split(url)
+        return slug if slug and not rest else None
+
+    def parse(self, html: str) -> Dict[str, Tuple[str, int]]:
+        """{slug: (capítulo mayor, anchors de capítulo)} para las series que aparecen en el feed."""
+        if isinstance(html, PageSnapshot):
+            anchors: Iterable[Tuple[str, str]] = html.pairs
+        else:
+            anchors = parse_document(html).anchors("a")
+        out: Dict[str, Tuple[str, int]] = {}
+        for text, href in anchors:
+            slug, rest = self._split(href)
+            if not slug or not rest:
+                continue
+            cap = self.extractor.anchor_chapter(text, href)
+            if cap is None:
+                continue
+            prev = out.get(slug)
+            if prev is None:
+                out[slug] = (cap, 1)
+            else:
+                best = cap if comparable_tuple(cap) > comparable_tuple(prev[0]) else prev[0]
+                out[slug] = (best, prev[1] + 1)
+        return out
@@ -1,56 +1,13 @@
 # -*- coding: utf-8 -*-
-import re
-from bs4 import BeautifulSoup
-from typing import Optional, List
-from ..utils import comparable_tuple, sanitize_chapter
-
-HASH_NUM = re.compile(r"#\s*(\d+(?:[.,]\d+)?)")
-CAP_RE   = re.compile(r"(?:Cap(?:[íi]tulo)?|Cap\.|Ch(?:apter|\.)|Episodio|Ep\.)\s*(\d+(?:[.,]\d+)?)", re.IGNORECASE)
-
-def _is_sane(num_str: str) -> bool:
-    try:
-        ent = num_str.split(".", 1)[0]
-        if len(ent) > 4:
-            return False
-        if int(ent) > 1000:
-            return False
-        return True
-    except Exception:
-        return False
-
-def parse_latest_chapter(html: str) -> Optional[str]:
-    soup = BeautifulSoup(html, "html.parser")
-    candidates: List[str] = []
-
-    # 1) Preferir anchors "de capítulo" por URL o texto:
-    for a in soup.select("a"):
-        href = (a.get("href") or "").lower()
-        text = a.get_text(" ", strip=True)
-        looks_like_chapter = any(seg in href for seg in ("/chapter", "/cap", "/ep", "/episodio"))
-        m = HASH_NUM.search(text) or CAP_RE.search(text) or (CAP_RE.search(href) if looks_like_chapter else None)
-        if not (m or looks_like_chapter):
-            continue
-        if not m:
-            m = HASH_NUM.search(href) or CAP_RE.search(href)
-            if not m:
-                continue
-        cap = sanitize_chapter(m.group(1))
-        if _is_sane(cap):
-            candidates.append(cap)
-
-    # 2) Fallback: antigua lista con clase ofuscada
-    if not candidates:
-        for li in soup.select('li[class*="DTyuZxQygzByzNbtcmg-lis"]'):
-            text = li.get_text(" ", strip=True)
-            m = HASH_NUM.search(text) or CAP_RE.search(text)
-            if not m:
-                continue
-            cap = sanitize_chapter(m.group(1))
-            if _is_sane(cap):
-                candidates.append(cap)
-
-    if not candidates:
-        return None
-
-    candidates.sort(key=lambda s: comparable_tuple(s))
-    return candidates[-1]
+from .engine import CAP_CH_EP, ChapterExtractor, element_text
+
+parse_latest_chapter = ChapterExtractor(
+    "m440",
+    # "#N" manda sobre "Capítulo N" en el texto del anchor
+    text_kinds=("hash", CAP_CH_EP),
+    # el href solo cuenta en anchors "de capítulo" por URL
+    href_kinds=(CAP_CH_EP, "hash"),
+    href_hints=("/chapter", "/cap", "/ep", "/episodio"),
+    # antigua lista con clase ofuscada
+    fallbacks=(element_text('li[class*="DTyuZxQygzByzNbtcmg-lis"]', kinds=("hash", CAP_CH_EP)),),
+)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Cuándo está lista una página para capturarla (en vez de dormir un tiempo fijo tras el scroll).
+
+La página está lista cuando:
+  - la cantidad de anchors de `selector` no cambió durante `stable_ms` (y hay al menos
+    `min_count`), o
+  - ya terminó una petición cuya URL contiene alguno de `xhr` (la lista de capítulos por
+    AJAX), hay al menos `min_count` anchors y el conteo no cambió desde el último sondeo,
+lo que pase primero, con `max_ms` como tope. Se sondea dentro del navegador (READY_JS con
+wait_for_function), así que esperar no cuesta idas y vueltas con Playwright.
+"""
+import os
+from typing import Any, Dict, Sequence
+
+READY_STABLE_MS = int(os.getenv("READY_STABLE_MS", "400"))
+READY_MAX_MS = int(os.getenv("READY_MAX_MS", "3000"))
+READY_POLL_MS = 100
+
+# Devuelve false mientras no esté lista; si no, el motivo ("stable" o "xhr")
+READY_JS = """(cfg) => {
+  const now = performance.now();
+  const n = document.querySelectorAll(cfg.selector).length;
+  const st = window.__ready_state || (window.__ready_state = {n: -1, since: now});
+  const changed = n !== st.n;
+  if (changed) { st.n = n; st.since = now; }
+  if (changed || n < cfg.min_count) return false;
+  if (cfg.xhr.length && performance.getEntriesByType("resource").some(
+        (e) => e.responseEnd > 0 && cfg.xhr.some((x) => e.name.includes(x)))) return "xhr";
+  return now - st.since >= cfg.stable_ms ? "stable" : false;
+}"""
+
+class Readiness:
+    def __init__(self, selector: str = "a", xhr: Sequence[str] = (), min_count: int = 1,
+                 stable_ms: int = READY_STABLE_MS, max_ms: int = READY_MAX_MS):
+        self.selector = selector
+        self.xhr = tuple(xhr)
+        self.min_count = min_count
+        self.stable_ms = stable_ms
+        self.max_ms = max_ms
+
+    def __repr__(self) -> str:
+        return f"Readiness({self.selector!r}, xhr={self.xhr!r})"
+
+    def config(self) -> Dict[str, Any]:
+        """Argumento de READY_JS."""
+        return {"selector": self.selector, "xhr": list(self.xhr),
+                "min_count": self.min_count, "stable_ms": self.stable_ms}
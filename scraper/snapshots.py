@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén de snapshots de páginas (reemplaza los volcados de last_html/).
+
+- Cada contenido se guarda una sola vez, comprimido con gzip, en
+  SNAPSHOT_DIR/objects/<h[:2]>/<sha256>.gz; dos fetches con el mismo HTML comparten objeto.
+- index.jsonl guarda una línea por fetch: serie, url, motor, momento, resultado
+  (ok / antibot / nomatch), hash y tamaños. Se lee sin tocar los objetos.
+- Un PageSnapshot (extracción en el navegador) se guarda como JSON con el recorte del
+  HTML y los anchors; load() lo devuelve como PageSnapshot, listo para pasarle al parser.
+- evict() borra por antigüedad (SNAPSHOT_MAX_DAYS) y luego los más viejos hasta quedar
+  bajo SNAPSHOT_MAX_MB.
+
+SNAPSHOTS=all (default) guarda todo, errors solo antibot/nomatch, off nada.
+
+  python -m scraper.snapshots list [serie]
+  python -m scraper.snapshots cat <hash>
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .sites.engine import PageSnapshot
+
+SNAPSHOT_MODE = os.getenv("SNAPSHOTS", "all").lower()
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+MAX_BYTES = float(os.getenv("SNAPSHOT_MAX_MB", "200")) * 1024 * 1024
+MAX_AGE_S = float(os.getenv("SNAPSHOT_MAX_DAYS", "14")) * 86400
+
+_lock = threading.Lock()
+
+def _index_path(root: str) -> str:
+    return os.path.join(root, "index.jsonl")
+
+def _object_path(root: str, digest: str) -> str:
+    return os.path.join(root, "objects", digest[:2], digest + ".gz")
+
+def _encode(content: Union[str, PageSnapshot]) -> Tuple[bytes, str]:
+    if isinstance(content, PageSnapshot):
+        data = {"probe": str(content), "anchors": content.pairs, "length": content.html_len,
+                "fallback": content.fallback}
+        return json.dumps(data, ensure_ascii=False).encode("utf-8"), "snapshot"
+    return (content or "").encode("utf-8"), "html"
+
+def save(series: Optional[str], url: str, engine: str, outcome: str,
+         content: Union[str, PageSnapshot], root: str = SNAPSHOT_DIR) -> Optional[str]:
+    """Guarda el contenido (si no estaba ya) y agrega la entrada al índice. Devuelve el hash."""
+    if SNAPSHOT_MODE == "off" or (SNAPSHOT_MODE == "errors" and outcome == "ok"):
+        return None
+    raw, kind = _encode(content)
+    digest = hashlib.sha256(raw).hexdigest()
+    path = _object_path(root, digest)
+    try:
+        with _lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = path + ".tmp"
+                # mtime=0: mismo contenido, mismo archivo
+                with gzip.GzipFile(tmp, "wb", mtime=0) as fh:
+                    fh.write(raw)
+                os.replace(tmp, path)
+            entry = {"ts": time.time(), "series": series or "unknown", "url": url, "engine": engine,
+                     "outcome": outcome, "hash": digest, "kind": kind, "bytes": len(raw),
+                     "stored": os.path.getsize(path)}
+            with open(_index_path(root), "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError:
+        return None
+    return digest
+
+def entries(series: Optional[str] = None, outcome: Optional[str] = None, engine: Optional[str] = None,
+            since: Optional[float] = None, root: str = SNAPSHOT_DIR) -> List[Dict[str, Any]]:
+    """Entradas del índice que cumplen los filtros, de la más nueva a la más vieja."""
+    out = []
+    try:
+        with open(_index_path(root), "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue
+                if ((series is None or e["series"] == series) and (outcome is None or e["outcome"] == outcome)
+                        and (engine is None or e["engine"] == engine) and (since is None or e["ts"] >= since)):
+                    out.append(e)
+    except OSError:
+        return []
+    out.reverse()
+    return out
+
+def latest(series: str, outcome: Optional[str] = None, root: str = SNAPSHOT_DIR) -> Optional[Dict[str, Any]]:
+    found = entries(series=series, outcome=outcome, root=root)
+    return found[0] if found else None
+
+def load(entry: Union[str, Dict[str, Any]], root: str = SNAPSHOT_DIR) -> Union[str, PageSnapshot]:
+    """Descomprime un solo objeto (por hash o por entrada del índice)."""
+    digest = entry if isinstance(entry, str) else entry["hash"]
+    with gzip.open(_object_path(root, digest), "rb") as fh:
+        raw = fh.read()
+    text = raw.decode("utf-8")
+    if not isinstance(entry, str) and entry.get("kind") != "snapshot":
+        return text
+    if text.startswith("{"):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return text
+        if isinstance(data, dict) and "anchors" in data and "probe" in data:
+            snap = PageSnapshot(data["probe"], data["anchors"], int(data.get("length") or 0))
+            snap.fallback = data.get("fallback") or {}
+            return snap
+    return text
+
+def evict(max_bytes: float = MAX_BYTES, max_age_s: float = MAX_AGE_S,
+          root: str = SNAPSHOT_DIR, now: Optional[float] = None) -> Tuple[int, int]:
+    """Aplica la retención. Devuelve (entradas borradas, bytes liberados en disco)."""
+    now = time.time() if now is None else now
+    with _lock:
+        kept = list(reversed(entries(root=root)))  # viejo -> nuevo
+        if not kept:
+            return 0, 0
+        total_before = len(kept)
+        kept = [e for e in kept if now - e["ts"] <= max_age_s]
+
+        sizes = {e["hash"]: e["stored"] for e in kept}
+        total = sum(sizes.values())
+        while kept and total > max_bytes:
+            e = kept.pop(0)
+            if not any(k["hash"] == e["hash"] for k in kept):
+                total -= sizes.pop(e["hash"], 0)
+
+        live = {e["hash"] for e in kept}
+        freed = 0
+        objects = os.path.join(root, "objects")
+        for dirpath, _, files in os.walk(objects):
+            for f in files:
+                if f.endswith(".gz") and f[:-3] not in live:
+                    p = os.path.join(dirpath, f)
+                    freed += os.path.getsize(p)
+                    os.remove(p)
+
+        tmp = _index_path(root) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for e in kept:
+                fh.write(json.dumps(e, ensure_ascii=False) + "\n")
+        os.replace(tmp, _index_path(root))
+    return total_before - len(kept), freed
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["list"]:
+        for e in entries(series=argv[1] if len(argv) > 1 else None):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["ts"]))
+            print(f"{when}  {e['outcome']:<8} {e['engine']:<9} {e['hash'][:12]}  {e['bytes']:>8}  {e['series']}")
+        return 0
+    if argv[:1] == ["cat"] and len(argv) > 1:
+        digest = next((e["hash"] for e in entries() if e["hash"].startswith(argv[1])), argv[1])
+        content = load(digest)
+        if isinstance(content, PageSnapshot):
+            print(json.dumps({"anchors": content.pairs, "fallback": content.fallback}, ensure_ascii=False, indent=1))
+        else:
+            sys.stdout.write(content)
+        return 0
+    print("Uso: python -m scraper.snapshots list [serie] | cat <hash>")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
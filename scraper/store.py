@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Estado de la corrida en SQLite (STATE_DB, default state.db): series.yaml queda solo como config.
+
+Tablas (clave = URL tal cual está en series.yaml):
+  - series:   capítulo actual por URL (y la huella de su lista de capítulos, ver scraper.fingerprint)
+  - chapters: historia de capítulos con la fecha en que se vieron
+  - fetches:  resultado del último fetch por URL (y la última revisión exitosa)
+  - meta:     valores sueltos (p. ej. la última pasada completa del planificador)
+
+Las escrituras de una corrida van en una sola transacción que se confirma con commit().
+Para revisar o migrar el estado a mano:
+  python -m scraper.store export estado.json
+  python -m scraper.store import estado.json
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .config import Series
+
+STATE_DB = os.getenv("STATE_DB", "state.db")
+
+# Estados de process_series_entry que cuentan como revisión exitosa
+CHECKED = ("ok", "update", "init", "keep")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    url        TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    chapter    TEXT,
+    updated_at REAL,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    id      INTEGER PRIMARY KEY,
+    url     TEXT NOT NULL,
+    chapter TEXT NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chapters_url_seen ON chapters (url, seen_at);
+CREATE TABLE IF NOT EXISTS fetches (
+    url        TEXT PRIMARY KEY,
+    ts         REAL NOT NULL,
+    status     TEXT NOT NULL,
+    chapter    TEXT,
+    error      TEXT,
+    checked_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_conn: Optional[sqlite3.Connection] = None
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Conexión única por proceso; crea el esquema si hace falta."""
+    global _conn
+    if _conn is None:
+        path = path or STATE_DB
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        _conn = sqlite3.connect(path)
+        _conn.row_factory = sqlite3.Row
+        _conn.executescript(SCHEMA)
+        _migrate(_conn)
+        _conn.commit()
+    return _conn
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Columnas agregadas después de crear la base."""
+    cols = {r["name"] for r in conn.execute("PRAGMA table_info(series)")}
+    if "fingerprint" not in cols:
+        conn.execute("ALTER TABLE series ADD COLUMN fingerprint TEXT")
+
+def commit() -> None:
+    if _conn is not None:
+        _conn.commit()
+
+def close(commit: bool = True) -> None:
+    """Cierra la conexión; con commit=False descarta lo no confirmado."""
+    global _conn
+    if _conn is not None:
+        if commit:
+            _conn.commit()
+        else:
+            _conn.rollback()
+        _conn.close()
+        _conn = None
+
+# --- lectura -------------------------------------------------------------------
+
+def current_chapter(url: str) -> Optional[str]:
+    row = connect().execute("SELECT chapter FROM series WHERE url = ?", (url,)).fetchone()
+    return row["chapter"] if row else None
+
+def all_chapters() -> Dict[str, str]:
+    return {r["url"]: r["chapter"] for r in connect().execute("SELECT url, chapter FROM series")}
+
+def chapter_for_fingerprint(url: str, fp: str) -> Optional[str]:
+    """Capítulo guardado si la huella coincide con la de la última revisión, si no None."""
+    row = connect().execute("SELECT chapter FROM series WHERE url = ? AND fingerprint = ?", (url, fp)).fetchone()
+    return row["chapter"] if row else None
+
+def change_times(url: str, limit: int = 8) -> List[float]:
+    """Momentos (ascendentes) de los últimos `limit` cambios de capítulo."""
+    rows = connect().execute(
+        "SELECT seen_at FROM chapters WHERE url = ? ORDER BY seen_at DESC LIMIT ?", (url, limit)).fetchall()
+    return [r["seen_at"] for r in reversed(rows)]
+
+def last_checked(url: str) -> Optional[float]:
+    row = connect().execute("SELECT checked_at FROM fetches WHERE url = ?", (url,)).fetchone()
+    return row["checked_at"] if row else None
+
+def get_meta(key: str, default: Optional[str] = None) -> Optional[str]:
+    row = connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else default
+
+# --- escritura (sin commit: se confirma todo junto al final) -----------------------
+
+def set_meta(key: str, value: Any) -> None:
+    connect().execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                      "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, str(value)))
+
+def set_chapter(url: str, name: str, chapter: str, ts: Optional[float] = None) -> None:
+    ts = time.time() if ts is None else ts
+    conn = connect()
+    conn.execute("INSERT INTO series (url, name, chapter, updated_at) VALUES (?, ?, ?, ?) "
+                 "ON CONFLICT(url) DO UPDATE SET name = excluded.name, chapter = excluded.chapter, "
+                 "updated_at = excluded.updated_at", (url, name, chapter, ts))
+    conn.execute("INSERT INTO chapters (url, chapter, seen_at) VALUES (?, ?, ?)", (url, chapter, ts))
+
+def set_fingerprint(url: str, fp: Optional[str]) -> None:
+    connect().execute("UPDATE series SET fingerprint = ? WHERE url = ?", (fp, url))
+
+def record_fetch(url: str, status: str, chapter: Optional[str] = None,
+                 error: Optional[str] = None, ts: Optional[float] = None) -> None:
+    """Guarda el resultado del último fetch; checked_at solo avanza si la revisión fue exitosa."""
+    ts = time.time() if ts is None else ts
+    checked = ts if status in CHECKED else None
+    connect().execute(
+        "INSERT INTO fetches (url, ts, status, chapter, error, checked_at) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(url) DO UPDATE SET ts = excluded.ts, status = excluded.status, chapter = excluded.chapter, "
+        "error = excluded.error, checked_at = COALESCE(excluded.checked_at, fetches.checked_at)",
+        (url, ts, status, chapter, error, checked))
+
+def seed_from_yaml(series: Iterable["Series"]) -> int:
+    """
+    Migración: toma el `chapter` que todavía tenga series.yaml para las URLs que no
+    están en la base. Con URLs repetidas se queda con el capítulo mayor.
+    """
+    best: Dict[str, "Series"] = {}
+    for s in series:
+        if not s.url or not s.chapter:
+            continue
+        if s.url not in best or s.chapter_key > best[s.url].chapter_key:
+            best[s.url] = s
+    known = all_chapters() if best else {}
+    n = 0
+    for url, s in best.items():
+        if known.get(url) is None:
+            set_chapter(url, s.name, s.chapter)
+            n += 1
+    return n
+
+# --- export / import -----------------------------------------------------------------
+
+TABLES = ("series", "chapters", "fetches", "meta")
+
+def export_state() -> Dict[str, List[Dict[str, Any]]]:
+    conn = connect()
+    return {t: [dict(r) for r in conn.execute(f"SELECT * FROM {t}")] for t in TABLES}
+
+def import_state(data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    """Reemplaza el contenido de cada tabla presente en `data`, en una sola transacción."""
+    conn = connect()
+    counts = {}
+    with conn:
+        for t in TABLES:
+            rows = data.get(t)
+            if rows is None:
+                continue
+            conn.execute(f"DELETE FROM {t}")
+            for r in rows:
+                cols = ", ".join(r)
+                marks = ", ".join("?" for _ in r)
+                conn.execute(f"INSERT INTO {t} ({cols}) VALUES ({marks})", tuple(r.values()))
+            counts[t] = len(rows)
+    return counts
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 1 or argv[0] not in ("export", "import"):
+        print("Uso: python -m scraper.store export|import [archivo.json]")
+        return 2
+    path = argv[1] if len(argv) > 1 else None
+    if argv[0] == "export":
+        out = json.dumps(export_state(), ensure_ascii=False, indent=1)
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(out)
+        else:
+            print(out)
+    else:
+        if path:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        else:
+            data = json.load(sys.stdin)
+        print(f"Importado: {import_state(data)}")
+    close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
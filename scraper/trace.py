@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Telemetría por serie y por etapa (launch, goto, wait_selector, settle, capture, parse, ...).
+
+Cada span se escribe como una línea JSON en TRACE_DIR/run-<fecha>.jsonl y además se
+acumula en memoria para el resumen p50/p95 por host al final de la corrida.
+La serie actual va en un contextvar, así los spans de tareas async o de
+asyncio.to_thread quedan atribuidos a la serie correcta.
+
+TRACE=0 desactiva el archivo (el resumen en memoria sigue funcionando).
+"""
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+TRACE_ENABLED = os.getenv("TRACE", "1") == "1"
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+
+_current: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("trace_series", default=None)
+_lock = threading.Lock()
+_fh = None
+_run_id = time.strftime("%Y%m%d-%H%M%S")
+# host -> etapa -> [ms]
+_stats: Dict[str, Dict[str, List[float]]] = {}
+# Lo mismo, solo spans que terminaron sin excepción (ver samples)
+_ok_stats: Dict[str, Dict[str, List[float]]] = {}
+# Marca del span 'series' que se emite después (ver defer)
+_DEFER = "_defer"
+
+def _emit(rec: Dict[str, Any]) -> None:
+    global _fh
+    host = rec.get("host") or "-"
+    with _lock:
+        _stats.setdefault(host, {}).setdefault(rec["stage"], []).append(rec["ms"])
+        if "error" not in rec:
+            _ok_stats.setdefault(host, {}).setdefault(rec["stage"], []).append(rec["ms"])
+        if not TRACE_ENABLED:
+            return
+        if _fh is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            _fh = open(os.path.join(TRACE_DIR, f"run-{_run_id}.jsonl"), "a", encoding="utf-8")
+        _fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+@contextmanager
+def series(name: str, url: str) -> Iterator[Dict[str, Any]]:
+    """Abre el contexto de una serie; al salir emite el span 'series' con el total y las anotaciones."""
+    rec = {"run": _run_id, "series": name, "host": urlparse(url).netloc.lower(), "stage": "series"}
+    token = _current.set(rec)
+    t0 = time.perf_counter()
+    try:
+        yield rec
+    finally:
+        rec["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        _current.reset(token)
+        if not rec.pop(_DEFER, False):
+            _emit(rec)
+
+def defer() -> Callable[..., None]:
+    """
+    El span 'series' en curso no se emite al salir del contexto (su ms sigue siendo ese)
+    sino al llamar lo devuelto, con las anotaciones finales: para series cuyo resultado
+    llega después (el parse en un worker de scraper.parsepool).
+    """
+    cur = _current.get()
+    if cur is None:
+        return lambda **attrs: None
+    cur[_DEFER] = True
+
+    def emit(**attrs) -> None:
+        cur.update(attrs)
+        _emit(cur)
+    return emit
+
+@contextmanager
+def span(stage: str, **attrs) -> Iterator[Dict[str, Any]]:
+    """Mide una etapa dentro de la serie actual (o suelta, si no hay serie)."""
+    cur = _current.get()
+    rec = {"run": _run_id, "series": cur["series"] if cur else None,
+           "host": cur["host"] if cur else None, "stage": stage, **attrs}
+    t0 = time.perf_counter()
+    try:
+        yield rec
+    except Exception as e:
+        rec["error"] = type(e).__name__
+        raise
+    finally:
+        rec["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        _emit(rec)
+
+def where() -> Dict[str, Optional[str]]:
+    """Serie y host del contexto actual, para record() desde otro hilo o proceso."""
+    cur = _current.get()
+    return {"series": cur["series"] if cur else None, "host": cur["host"] if cur else None}
+
+def record(stage: str, ms: float, series: Optional[str] = None, host: Optional[str] = None, **attrs) -> None:
+    """Span ya medido fuera del contexto de la serie (p. ej. el parse en un worker de scraper.parsepool)."""
+    _emit({"run": _run_id, "series": series, "host": host, "stage": stage, **attrs, "ms": round(ms, 1)})
+
+def annotate(**attrs) -> None:
+    """Agrega datos (engine, html_len, status, ...) al span 'series' en curso."""
+    cur = _current.get()
+    if cur is not None:
+        cur.update(attrs)
+
+def _pct(values: List[float], p: float) -> float:
+    # nearest-rank
+    s = sorted(values)
+    k = max(0, min(len(s) - 1, math.ceil(p / 100.0 * len(s)) - 1))
+    return s[k]
+
+def samples(stage: str) -> Dict[str, List[float]]:
+    """{host: [ms]} de la etapa en esta corrida, sin los spans que fallaron (timeouts incluidos)."""
+    with _lock:
+        return {h: list(st[stage]) for h, st in _ok_stats.items() if st.get(stage)}
+
+def summary_lines() -> List[str]:
+    """p50/p95 por host: total por serie y las etapas más costosas."""
+    lines = []
+    with _lock:
+        stats = {h: {k: list(v) for k, v in st.items()} for h, st in _stats.items()}
+    for host in sorted(stats):
+        st = stats[host]
+        tot = st.get("series")
+        if not tot:
+            continue
+        head = f"  {host}: {len(tot)} series, p50={_pct(tot, 50) / 1000:.1f}s p95={_pct(tot, 95) / 1000:.1f}s"
+        stages = sorted(((k, v) for k, v in st.items() if k != "series"), key=lambda kv: -sum(kv[1]))
+        detail = ", ".join(f"{k} p50={_pct(v, 50):.0f}ms p95={_pct(v, 95):.0f}ms" for k, v in stages[:5])
+        lines.append(head + (f" | {detail}" if detail else ""))
+    return lines
+
+def trace_path() -> Optional[str]:
+    return os.path.join(TRACE_DIR, f"run-{_run_id}.jsonl") if (TRACE_ENABLED and _fh is not None) else None
+
+def close() -> None:
+    global _fh
+    with _lock:
+        if _fh is not None:
+            _fh.close()
+            _fh = None
+
+def reset() -> None:
+    """Empieza otra corrida (daemon): archivo nuevo y resumen desde cero."""
+    global _run_id
+    close()
+    with _lock:
+        _run_id = time.strftime("%Y%m%d-%H%M%S")
+        _stats.clear()
+        _ok_stats.clear()
@@ -1,20 +1,48 @@
 # -*- coding: utf-8 -*-
 import os
 import re
+import json
 import yaml
 
+# libyaml (C) si está disponible; si no, el loader/dumper puro de PyYAML
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Estado aprendido entre corridas (no es config; en CI se restaura con actions/cache)
+STATE_DIR = os.getenv("STATE_DIR", "state")
+
 def yprint(s: str) -> None:
     print(s, flush=True)
 
+def state_path(name: str) -> str:
+    return os.path.join(STATE_DIR, name)
+
+def load_json(path: str, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+def save_json(path: str, data) -> None:
+    """Escritura atómica (tmp + replace) para no dejar archivos a medias si la corrida muere."""
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
 def load_yaml(path: str):
     if not os.path.exists(path):
         return {"series": []}
     with open(path, "r", encoding="utf-8") as fh:
-        return yaml.safe_load(fh) or {"series": []}
+        return yaml.load(fh, Loader=YAML_LOADER) or {"series": []}
 
 def save_yaml(path: str, data):
     with open(path, "w", encoding="utf-8") as fh:
-        yaml.safe_dump(data, fh, allow_unicode=True, sort_keys=False)
+        yaml.dump(data, fh, Dumper=YAML_DUMPER, allow_unicode=True, sort_keys=False)
 
 def comparable_tuple(s: str):
     if s is None:
@@ -57,5 +85,8 @@ def fmt_series_line(name: str, chap: str, status: str) -> str:
         "ok": "✅",
         "keep": "🛡️",
         "info": "ℹ️",
+        "skip": "💤",
+        "cut": "⏱️",
     }.get(status, "▪️")
-    return f"{emoji} **{name}** — cap **{chap}** ({status})"
+    label = {"skip": "not due", "cut": "sin tiempo"}.get(status, status)
+    return f"{emoji} **{name}** — cap **{chap}** ({label})"
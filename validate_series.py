@@ -1,17 +1,17 @@
 # -*- coding: utf-8 -*-
 """
 Valida/depura series.yaml:
- - Deduplica por URL (normalizada) conservando capítulo mayor
+ - Deduplica por URL (normalizada) conservando capítulo mayor (según state.db)
  - Marca URLs truncadas (contienen '...')
  - Normaliza esquema/host (quita www), borra query/fragment y slash final
 Uso:
   python validate_series.py
 """
-import yaml
 from urllib.parse import urlparse, urlunparse
 from collections import OrderedDict
 
-SERIES_FILE = "series.yaml"
+from scraper import store
+from scraper.config import SERIES_FILE, Series, load_series, save_series, with_chapters
 
 def norm_url(u: str) -> str:
     u = (u or "").strip()
@@ -29,49 +29,32 @@ def norm_url(u: str) -> str:
     p2 = p._replace(scheme=scheme, netloc=netloc, path=path, query="", fragment="")
     return urlunparse(p2)
 
-def chap_tuple(ch: str):
-    ch = str(ch or "0").replace(",", ".")
-    parts = ch.split(".")
-    major = int(parts[0]) if parts and parts[0].isdigit() else 0
-    minor = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
-    return (major, minor)
-
-def load_yaml(path: str):
-    with open(path, "r", encoding="utf-8") as fh:
-        return yaml.safe_load(fh) or {"series": []}
-
-def save_yaml(path: str, data):
-    with open(path, "w", encoding="utf-8") as fh:
-        yaml.safe_dump(data, fh, allow_unicode=True, sort_keys=False)
-
 def main():
-    data = load_yaml(SERIES_FILE)
-    series = data.get("series", [])
+    series = load_series(SERIES_FILE)
+    # Un `chapter` que siga en el YAML pasa al store antes de reescribir el archivo
+    store.seed_from_yaml(series)
+    with_chapters(series)
+    store.close()
 
     bad_urls = []
-    by_url = OrderedDict()
+    by_url: "OrderedDict[str, Series]" = OrderedDict()
 
-    for e in series:
-        url = (e.get("url") or "").strip()
+    for s in series:
+        url = s.url
         if "..." in url or not (url.startswith("http://") or url.startswith("https://")):
-            bad_urls.append((e.get("name", ""), url))
+            bad_urls.append((s.name, url))
             # no lo metemos a dedupe; requiere corrección manual
             continue
 
         key = norm_url(url)
         prev = by_url.get(key)
-        if not prev:
-            by_url[key] = e
-        else:
-            # conserva capítulo mayor
-            cur_ch = str(e.get("chapter") or "0")
-            prev_ch = str(prev.get("chapter") or "0")
-            by_url[key] = e if chap_tuple(cur_ch) > chap_tuple(prev_ch) else prev
+        # conserva capítulo mayor
+        if not prev or s.chapter_key > prev.chapter_key:
+            by_url[key] = s
 
-    out = {"series": list(by_url.values())}
-    save_yaml(SERIES_FILE, out)
+    save_series(SERIES_FILE, by_url.values())
 
-    print(f"[ok] Deduplicado: quedaron {len(out['series'])} entradas.")
+    print(f"[ok] Deduplicado: quedaron {len(by_url)} entradas.")
     if bad_urls:
         print("\n[warn] URLs inválidas/truncadas (corrige copiando la URL completa del navegador):")
         for name, url in bad_urls: